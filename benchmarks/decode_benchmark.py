@@ -0,0 +1,66 @@
+"""Compare decoding a large block of float datapoints per datapoint and vectorized.
+
+Run from the repository root:
+    python benchmarks/decode_benchmark.py [datapoints] [word order]
+
+The vectorized engine needs NumPy, which is optional for the integration.
+"""
+import os
+import struct
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components", "modbus_devices"))
+
+from devices.const import ByteOrder, WordOrder, ModbusDataType, ModbusMode
+from devices.datatypes import ModbusDatapoint
+from devices.readplan import ModbusReadBlock
+from devices.vectorized import np, VectorDecoder
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    word_order = WordOrder(sys.argv[2]) if len(sys.argv) > 2 else WordOrder.NORMAL
+    byte_order = ByteOrder.MSB
+    number = 2000
+
+    # A block of float32 pairs, like the INPUT groups of an energy meter
+    block = ModbusReadBlock(ModbusMode.INPUT, 0, count * 2)
+    for i in range(count):
+        dp = ModbusDatapoint(address=i * 2, register_count=2, type=ModbusDataType.FLOAT, scaling=0.1, offset=1)
+        dp.compile(byte_order, word_order)
+        block.datapoints.append((None, f"Value {i}", dp))
+
+    registers = [reg for i in range(count) for reg in struct.unpack(">2H", struct.pack(">f", 230.0 + i))]
+    block.raw = struct.pack(f">{len(registers)}H", *registers)
+
+    def per_datapoint_registers():
+        for _, _, dp in block.datapoints:
+            dp.from_modbus(registers[dp.address:dp.address + 2], byte_order, word_order)
+
+    def per_datapoint_buffer():
+        for _, _, dp in block.datapoints:
+            dp.from_buffer(block.raw, dp.address * 2, byte_order, word_order)
+
+    results = {
+        "from_modbus per datapoint": timeit.timeit(per_datapoint_registers, number=number),
+        "from_buffer per datapoint": timeit.timeit(per_datapoint_buffer, number=number),
+    }
+
+    if np is not None:
+        decoder = VectorDecoder(block, byte_order, word_order)
+
+        def vectorized():
+            for (_, _, dp), value in zip(block.datapoints, decoder.decode(block.raw)):
+                dp.value = value
+
+        results["NumPy vectorized"] = timeit.timeit(vectorized, number=number)
+    else:
+        print("NumPy is not installed, skipping the vectorized engine")
+
+    print(f"{count} float datapoints, word order {word_order.value}, {number} blocks:")
+    baseline = results["from_modbus per datapoint"]
+    for name, seconds in results.items():
+        print(f"  {name:28} {seconds * 1e6 / number:8.1f} us/block  {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -22,12 +22,16 @@ from .const import (
     CONF_SLAVE_ID,
     CONF_SCAN_INTERVAL,
     CONF_SCAN_INTERVAL_FAST,
+    CONF_MAX_INFLIGHT,
+    DEFAULT_MAX_INFLIGHT,
+    DEFAULT_RTU_TIMEOUT,
     DEVICE_MODE_TCPIP, DEVICE_MODE_RTU
 )
 
 from .coordinator import ModbusCoordinator
 from .devices.connection import TCPConnectionParams, RTUConnectionParams
 from .rtu_bus import RTUBusManager, RTUBusClient
+from .websocket import async_register_websocket_commands
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -50,7 +54,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         ip = entry.data[CONF_IP]
         port = entry.data[CONF_PORT]
         slave_id = entry.data[CONF_SLAVE_ID]
-        connection_params = TCPConnectionParams(ip, port, slave_id)
+        max_inflight = entry.data.get(CONF_MAX_INFLIGHT, DEFAULT_MAX_INFLIGHT)
+        connection_params = TCPConnectionParams(ip, port, slave_id, max_inflight)
     elif device_mode == DEVICE_MODE_RTU:
         serial_port = entry.data[CONF_SERIAL_PORT]
         baudrate = entry.data[CONF_SERIAL_BAUD]
@@ -62,11 +67,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
         if bus is None:
             # First device on this port → create bus
-            bus = RTUBusManager(hass=hass, port=serial_port, baudrate=baudrate, bytesize=8, parity="N", stopbits=1, timeout=3.0)
+            bus = RTUBusManager(hass=hass, port=serial_port, baudrate=baudrate, bytesize=8, parity="N", stopbits=1, timeout=DEFAULT_RTU_TIMEOUT)
             rtu_buses[serial_port] = bus
         else:
             # Validate settings
-            if not bus.matches_serial_config(baudrate=baudrate, bytesize=8, parity="N", stopbits=1, timeout=3.0):
+            if not bus.matches_serial_config(baudrate=baudrate, bytesize=8, parity="N", stopbits=1, timeout=DEFAULT_RTU_TIMEOUT):
                 _LOGGER.error("Serial port %s already in use with different settings", serial_port)
                 return False
 
@@ -106,6 +111,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Register services
     hass.services.async_register(DOMAIN, "request_update",partial(service_request_update, hass))
+    async_register_websocket_commands(hass)
     
     return True
 
@@ -127,7 +133,7 @@ async def service_request_update(hass, call: ServiceCall):
     """Find the coordinator corresponding to the given device ID."""
     for entry_id, coordinator in hass.data[DOMAIN].items():
         if getattr(coordinator, "device_id", None) == device_id:
-            await coordinator._async_update_data()
+            await coordinator.request_update()
             return
 
     _LOGGER.warning("No coordinator found for device ID %s", device_id)
@@ -0,0 +1,56 @@
+"""Persistent storage of learned unreadable addresses, shared by all devices."""
+import asyncio
+import logging
+
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .devices.const import ModbusMode
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.unreadable_addresses"
+SAVE_DELAY = 10  # Seconds
+
+class UnreadableAddressStore:
+    """Unreadable addresses per driver and firmware version.
+
+    Stored as {driver: {"last_firmware": str, "firmware": {firmware: {mode name: [addresses]}}}}.
+    """
+
+    def __init__(self, hass):
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: dict = {}
+
+    async def async_load(self):
+        self._data = await self._store.async_load() or {}
+
+    def get(self, driver: str, firmware: str | None = None) -> tuple[str | None, dict[ModbusMode, set[int]]]:
+        """Return the firmware and addresses stored for a driver, defaulting to the last firmware seen."""
+        entry = self._data.get(driver)
+        if entry is None:
+            return firmware, {}
+
+        firmware = firmware if firmware is not None else entry.get("last_firmware")
+        stored = entry.get("firmware", {}).get(firmware, {})
+        return firmware, {ModbusMode[mode]: set(addresses) for mode, addresses in stored.items()}
+
+    def update(self, driver: str, firmware: str, addresses: dict[ModbusMode, set[int]]):
+        entry = self._data.setdefault(driver, {"firmware": {}})
+        entry["last_firmware"] = firmware
+        entry["firmware"][firmware] = {mode.name: sorted(addrs) for mode, addrs in addresses.items() if addrs}
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+async def async_get_address_store(hass) -> UnreadableAddressStore:
+    """Return the shared store, loading it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    lock = domain_data.setdefault("address_store_lock", asyncio.Lock())
+
+    async with lock:
+        store = domain_data.get("address_store")
+        if store is None:
+            store = UnreadableAddressStore(hass)
+            await store.async_load()
+            domain_data["address_store"] = store
+    return store
@@ -11,6 +11,7 @@ from homeassistant.helpers import selector
 from typing import Any
 
 from .const import DOMAIN, CONF_DEVICE_MODE, CONF_NAME, CONF_DEVICE_MODEL, CONF_IP, CONF_PORT, CONF_SLAVE_ID, CONF_SCAN_INTERVAL, CONF_SCAN_INTERVAL_FAST
+from .const import CONF_MAX_INFLIGHT, DEFAULT_MAX_INFLIGHT
 from .const import CONF_MODE_SELECTION, CONF_ADD_TCPIP, CONF_ADD_RTU
 from .const import CONF_SERIAL_PORT, CONF_SERIAL_BAUD
 from .const import DEVICE_MODE_TCPIP, DEVICE_MODE_RTU
@@ -28,7 +29,8 @@ DEVICE_DATA_TCPIP = {
     CONF_PORT: 502,
     CONF_SLAVE_ID: 1,
     CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
-    CONF_SCAN_INTERVAL_FAST: DEFAULT_SCAN_INTERVAL_FAST
+    CONF_SCAN_INTERVAL_FAST: DEFAULT_SCAN_INTERVAL_FAST,
+    CONF_MAX_INFLIGHT: DEFAULT_MAX_INFLIGHT
 }
 
 DEVICE_DATA_RTU = {
@@ -164,6 +166,7 @@ async def getTcpIpDeviceSchema(user_input: dict[str, Any] | None = None) -> vol.
             vol.Optional(CONF_SLAVE_ID, description="Slave ID", default=user_input[CONF_SLAVE_ID]): vol.All(vol.Coerce(int), vol.Range(min=0, max=256)),
             vol.Optional(CONF_SCAN_INTERVAL, default=user_input[CONF_SCAN_INTERVAL]): vol.All(vol.Coerce(int), vol.Range(min=5, max=999)),
             vol.Optional(CONF_SCAN_INTERVAL_FAST, default=user_input[CONF_SCAN_INTERVAL_FAST]): vol.All(vol.Coerce(int), vol.Range(min=1, max=999)),
+            vol.Optional(CONF_MAX_INFLIGHT, default=user_input.get(CONF_MAX_INFLIGHT, DEFAULT_MAX_INFLIGHT)): vol.All(vol.Coerce(int), vol.Range(min=1, max=8)),
         }
     )
     return data_schema
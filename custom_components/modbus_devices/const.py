@@ -12,10 +12,14 @@ CONF_DEVICE_MODEL: str = "device_model"
 CONF_SLAVE_ID: str = "slave_id"
 CONF_SCAN_INTERVAL: str = "scan_interval"
 CONF_SCAN_INTERVAL_FAST: str = "scan_interval_fast"
+CONF_MAX_INFLIGHT: str = "max_inflight"
 
 # Defaults
 DEFAULT_SCAN_INTERVAL: int = 300  # Seconds
 DEFAULT_SCAN_INTERVAL_FAST: int = 5  # Seconds
+DEFAULT_MAX_INFLIGHT: int = 1  # Concurrent TCP requests per device
+DEFAULT_RTU_TIMEOUT: float = 3.0  # Seconds, longest wait for an RTU response, used until a slave's latency is known
+DEFAULT_UPDATE_TIMEOUT: float = 20  # Seconds, for a whole update of devices without per-request deadlines
 
 # Configuration mode selection
 CONF_MODE_SELECTION = "mode_selection"
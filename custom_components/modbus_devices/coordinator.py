@@ -1,16 +1,21 @@
-import async_timeout
+import asyncio
 import copy
 import datetime as dt
 import logging
+import time
 
+from homeassistant.core import callback
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed, ConfigEntryNotReady, ConfigEntryError
 
+from .address_store import UnreadableAddressStore, async_get_address_store
+from .const import DEFAULT_UPDATE_TIMEOUT
 from .devices.helpers import load_device_class
 from .devices.datatypes import ModbusDefaultGroups, ModbusDatapoint
 from .devices.datatypes import EntityDataSelect, EntityDataNumber
 from .devices.modbusdevice import ModbusDevice
 from .entity import ModbusBaseEntity
+from .rtu_bus import PRIORITY_INTERACTIVE, PRIORITY_WRITE, QueueWaitMeter, bus_priority, measure_queue_wait
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +37,7 @@ class ModbusCoordinator(DataUpdateCoordinator):
 
         self._fast_poll_enabled = False
         self._fast_poll_count = 0
+        self._read_all_requested = False    # Read every polled group in the next update, not only those that are due
         self._normal_poll_interval = scan_interval
         self._fast_poll_interval = scan_interval_fast
 
@@ -39,11 +45,29 @@ class ModbusCoordinator(DataUpdateCoordinator):
 
         self._modbusDevice: ModbusDevice | None = None
 
+        # Learned unreadable addresses, shared between devices of the same model
+        self._address_store: UnreadableAddressStore | None = None
+        self._address_firmware: str | None = None
+
         # Storage for config selection
         self.config_value_select:ModbusBaseEntity = None
         self.config_value_number:ModbusBaseEntity = None
         self.config_value_active:ModbusBaseEntity = None
 
+        # Background bulk read of the CONFIG group
+        self._config_prefetch: asyncio.Task | None = None
+        self._config_prefetch_failures = 0          # Consecutive failed prefetches
+        self._config_prefetch_retry_at = 0.0        # Monotonic time before which a failed prefetch isn't started again
+
+        # Targeted refresh after writes, of the written (group, key)s by (group unique_id, key)
+        self._written: dict[tuple[str, str], tuple] = {}
+        self._write_refresh: asyncio.Task | None = None
+        self._write_refresh_rounds = 0
+
+        # Seconds the last update waited for a shared RTU bus, and the number of requests it made
+        self.last_queue_wait = 0.0
+        self.last_request_count = 0
+
     async def _async_setup(self):
         # Load modbus device driver
         device_class = await load_device_class(self.device_model)
@@ -52,11 +76,23 @@ class ModbusCoordinator(DataUpdateCoordinator):
                 self._modbusDevice = device_class(self.connection_params, self.rtu_bus)
             except Exception as err:
                 raise ConfigEntryNotReady("Could not read data from device!") from err
+            self._modbusDevice.setPollInterval(self._normal_poll_interval, self._fast_poll_interval)
+
+            # Start out with the holes learned for the firmware this model had last time
+            self._address_store = await async_get_address_store(self.hass)
+            self._address_firmware, addresses = self._address_store.get(self.device_model)
+            self._modbusDevice.setUnreadableAddresses(addresses)
         else:
             raise ConfigEntryError
 
     def close(self):
         """Close the underlying device safely."""
+        if self._config_prefetch is not None:
+            self._config_prefetch.cancel()
+        if self._write_refresh is not None:
+            self._write_refresh.cancel()
+        if self.rtu_bus is not None:
+            self.rtu_bus.cancel_poll(self)
         self._modbusDevice.close()
 
     @property
@@ -84,6 +120,13 @@ class ModbusCoordinator(DataUpdateCoordinator):
         self.update_interval = dt.timedelta(seconds=self._normal_poll_interval)
 
 
+    async def request_update(self):
+        """ Update requested by the user, reads every polled group regardless of when it is due """
+        self._read_all_requested = True
+        # Through async_refresh, so the changed values reach the entities
+        with bus_priority(PRIORITY_INTERACTIVE):
+            await self.async_refresh()
+
     async def _async_update_data(self):
         _LOGGER.debug("Coordinator updating data for: %s", self.devicename) 
 
@@ -93,16 +136,85 @@ class ModbusCoordinator(DataUpdateCoordinator):
             if self._fast_poll_count > 5:
                 self.setNormalPollMode()
 
-        """ Fetch data """
+        """ Fetch data, time spent waiting for a shared bus doesn't count towards the timeout """
+        meter = QueueWaitMeter()
         try:
-            async with async_timeout.timeout(20):
-                await self._modbusDevice.readData()       
+            async with asyncio.timeout(self._modbusDevice.updateTimeout() or DEFAULT_UPDATE_TIMEOUT) as deadline:
+                meter.timeout = deadline
+                with measure_queue_wait(meter):
+                    all_groups = self._fast_poll_enabled or self._read_all_requested
+                    self._read_all_requested = False
+                    await self._modbusDevice.readData(all_groups=all_groups)
+
+            if self._modbusDevice.fastPollRequested:
+                self._modbusDevice.fastPollRequested = False
+                self.setFastPollMode()
         except Exception as err:
             _LOGGER.warning("Failed to update %s: %s", self.devicename, err)
             raise UpdateFailed from err
+        finally:
+            self.last_queue_wait = meter.total
+            self.last_request_count = meter.requests
+            if meter.total:
+                _LOGGER.debug("%s waited %.3f s for the bus during %s requests", self.devicename, meter.total, meter.requests)
+            self._schedule_next_poll()
         
+        self._update_unreadable_addresses()
         await self._async_update_deviceInfo()
 
+        # Handles of all values that changed, by polling, calculations or writes, so entities can skip unchanged state
+        return self._modbusDevice.valueStore.popChanged()
+
+    def _update_unreadable_addresses(self):
+        """ Keep learned holes in sync with storage, keyed by driver and firmware """
+        firmware = str(self._modbusDevice.sw_version)
+        if firmware != self._address_firmware:
+            _LOGGER.debug("Loading unreadable addresses for %s firmware %s", self.device_model, firmware)
+            preloaded = self._address_firmware is not None
+            self._address_firmware, addresses = self._address_store.get(self.device_model, firmware)
+
+            if not preloaded:
+                # Nothing was known at startup, so keep what has been learned so far
+                for mode, learned in self._modbusDevice.unreadableAddresses.items():
+                    addresses.setdefault(mode, set()).update(learned)
+            # Otherwise the preloaded holes were learned on another firmware and are dropped
+            self._modbusDevice.setUnreadableAddresses(addresses)
+
+        if self._modbusDevice.unreadableAddressesChanged:
+            self._modbusDevice.unreadableAddressesChanged = False
+            self._address_store.update(self.device_model, firmware, self._modbusDevice.unreadableAddresses)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """ Devices on a shared RTU port are polled by the bus, so their reads don't race each other """
+        if self.rtu_bus is None:
+            super()._schedule_refresh()
+            return
+
+        if self.update_interval is None:
+            return
+        if self.config_entry and self.config_entry.pref_disable_polling:
+            return
+
+        # Back-pressure: a congested bus stretches the interval by as long as the last update waited for it, at most doubling it
+        interval = self.update_interval.total_seconds()
+        self.rtu_bus.schedule_poll(self, interval + min(self.last_queue_wait, interval))
+
+    @callback
+    def _unschedule_refresh(self) -> None:
+        if self.rtu_bus is not None:
+            self.rtu_bus.cancel_poll(self)
+        super()._unschedule_refresh()
+
+    def _schedule_next_poll(self):
+        """ Wake up when the next group is due, groups may have their own poll interval """
+        if self._fast_poll_enabled:
+            return
+        next_poll = self._modbusDevice.secondsUntilNextPoll()
+        if next_poll is None:
+            next_poll = self._normal_poll_interval
+        self.update_interval = dt.timedelta(seconds=max(1, min(next_poll, self._normal_poll_interval)))
+
     async def _async_update_deviceInfo(self) -> None:
         device_registry = dr.async_get(self.hass)
         device_registry.async_update_device(
@@ -151,15 +263,38 @@ class ModbusCoordinator(DataUpdateCoordinator):
             await self._swap_config_value_entity(new_dp)
         try:
             # Update entity settings and read value
-            self.config_value_active.modbusDataPoint = new_dp
-            self.config_value_active._group = ModbusDefaultGroups.CONFIG
-            self.config_value_active._key = key
-            self.config_value_active._loadEntitySettings()
-            await self._modbusDevice.readValue(ModbusDefaultGroups.CONFIG, key)
+            self.config_value_active.bind_datapoint(ModbusDefaultGroups.CONFIG, key, new_dp)
+            await self._read_config_value(key)
         finally:
             _LOGGER.debug("Updating!")
             self.config_value_active.async_schedule_update_ha_state()
 
+    async def _read_config_value(self, key):
+        """ Serve config values from the bulk prefetch, falling back to reading the single value """
+        max_age = self._modbusDevice.config_max_age
+
+        # Don't wait for a prefetch in progress, it reads at background priority. The value is read directly unless cached
+        with bus_priority(PRIORITY_INTERACTIVE):
+            await self._modbusDevice.readValue(ModbusDefaultGroups.CONFIG, key, max_age=max_age)
+
+        # Refresh the rest of the group in the background once the cache has expired
+        if (self._config_prefetch is None or self._config_prefetch.done()) and time.monotonic() >= self._config_prefetch_retry_at:
+            if any(self._modbusDevice.valueAge(ModbusDefaultGroups.CONFIG, k) > max_age for k in self._modbusDevice.Datapoints[ModbusDefaultGroups.CONFIG]):
+                self._config_prefetch = self.hass.async_create_background_task(
+                    self._async_prefetch_config(), f"{self.name} config prefetch"
+                )
+
+    async def _async_prefetch_config(self):
+        try:
+            await self._modbusDevice.prefetchGroup(ModbusDefaultGroups.CONFIG)
+            self._config_prefetch_failures = 0
+        except Exception as err:
+            # Don't start it again on every selection, wait twice as long after each consecutive failure up to 8 times
+            self._config_prefetch_failures += 1
+            backoff = self._modbusDevice.config_max_age * 2 ** min(self._config_prefetch_failures - 1, 3)
+            self._config_prefetch_retry_at = time.monotonic() + backoff
+            _LOGGER.debug("Prefetch of config values failed for %s, retrying in %ss: %s", self.devicename, backoff, err)
+
     def get_config_options(self):
         options = {}
         for i, config in enumerate(self._modbusDevice.Datapoints[ModbusDefaultGroups.CONFIG]):
@@ -169,24 +304,70 @@ class ModbusCoordinator(DataUpdateCoordinator):
     ################################
     ######### Read / Write #########
     ################################   
-    def get_value(self, group, key):
-        if group in self._modbusDevice.Datapoints:
-            if key in self._modbusDevice.Datapoints[group]:
-                return self._modbusDevice.Datapoints[group][key].value
-        return None
+    @property
+    def value_store(self):
+        return self._modbusDevice.valueStore
 
-    def get_attrs(self, group, key):
-        if group in self._modbusDevice.Datapoints:
-            if key in self._modbusDevice.Datapoints[group]:
-                return self._modbusDevice.Datapoints[group][key].entity_data.attrs
+    def get_handle(self, group, key) -> int:
+        return self._modbusDevice.getHandle(group, key)
+
+    def get_history(self, group, key):
+        return self._modbusDevice.getHistory(group, key)
+
+    def find_history(self, key):
+        # History of the first datapoint with this key, for lookups by name only
+        for group, datapoints in self._modbusDevice.Datapoints.items():
+            if key in datapoints:
+                return self.get_history(group, key)
         return None
 
+    def set_datapoint_used(self, group, key, used: bool):
+        # Entities report when they are added or removed, so disabled entities aren't polled
+        self._modbusDevice.setDatapointUsed(group, key, used)
+
+    def is_group_available(self, group):
+        # Groups whose last poll failed are unavailable, while the rest of the device keeps updating
+        return group.unique_id not in self._modbusDevice.failedGroups
+
     async def write_value(self, group, key, value):
         _LOGGER.debug("Write_Data: %s - %s - %s", group, key, value)
         try:
-            await self._modbusDevice.writeValue(group, key, value)
+            with bus_priority(PRIORITY_WRITE):
+                await self._modbusDevice.writeValue(group, key, value)
         except Exception as exc:
             _LOGGER.error("Failed to write value '%s' to key '%s' in group '%s': %s", value, key, group, exc, exc_info=exc)
             raise
 
-        self.setFastPollMode()
\ No newline at end of file
+        self._schedule_write_refresh(group, key)
+
+    def _schedule_write_refresh(self, group, key):
+        """ Read back what the write may have changed, instead of fast polling the whole device """
+        self._written[(group.unique_id, key)] = (group, key)
+        self._write_refresh_rounds = 0
+        if self._write_refresh is None or self._write_refresh.done():
+            self._write_refresh = self.hass.async_create_background_task(
+                self._async_write_refresh(), f"{self.name} refresh after write"
+            )
+
+    async def _async_write_refresh(self):
+        try:
+            # A new write starts the count over, and adds its groups to the refresh
+            while self._write_refresh_rounds < self._modbusDevice.write_refreshes:
+                await asyncio.sleep(self._fast_poll_interval)
+                self._write_refresh_rounds += 1
+
+                try:
+                    with bus_priority(PRIORITY_INTERACTIVE):
+                        changed = await self._modbusDevice.refreshWritten(list(self._written.values()))
+                except Exception as err:
+                    _LOGGER.debug("Refresh after write failed for %s: %s", self.devicename, err)
+                    break
+                # Only notify the entities, async_set_updated_data would postpone the next poll and mark the device available
+                self.data = self._modbusDevice.valueStore.popChanged()
+                self.async_update_listeners()
+
+                # The device has settled once a refresh after the first one changes nothing
+                if not changed and self._write_refresh_rounds > 1:
+                    break
+        finally:
+            self._written.clear()
\ No newline at end of file
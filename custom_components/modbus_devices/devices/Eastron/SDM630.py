@@ -44,6 +44,9 @@ class Device(ModbusDevice):
     manufacturer = "Eastron"
     model = "SDM630"
 
+    # Unused input registers read as zero, so nearby groups can share one request
+    max_read_gap = 20
+
     def loadDatapoints(self):
         # MAIN SENSORS (INPUT REGISTERS)
         self.Datapoints[GROUP_INPUT_1] = {
@@ -32,6 +32,11 @@ class Device(ModbusDevice):
     manufacturer = "Swegon"
     model = "CASA"
 
+    # Efficiency and alarm summaries are calculated from sensors and alarms that may have their entities disabled
+    skip_unused_datapoints = False
+    # Alarm attributes are set per device at runtime
+    share_definitions = False
+
     def loadDatapoints(self):
         # COMMANDS - Read/Write
         self.Datapoints[GROUP_COMMANDS] = {
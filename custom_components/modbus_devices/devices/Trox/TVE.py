@@ -22,6 +22,9 @@ class Device(ModbusDevice):
     manufacturer="Trox"
     model="TVE"
 
+    # Flow units and alarm attributes are set per device at runtime
+    share_definitions = False
+
     def loadDatapoints(self):
         # GROUP 0
         self.Datapoints[GROUP_0] = {
@@ -0,0 +1,45 @@
+from .const import ModbusAggregate
+
+class ModbusAggregator:
+    """Running aggregate of the samples of one datapoint, over one publish window."""
+    __slots__ = ("mode", "count", "total", "min", "max", "last")
+
+    def __init__(self, mode: ModbusAggregate):
+        self.mode = mode
+        self.last = None            # Last sample, kept across windows since unchanged registers aren't decoded again
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, sample):
+        self.last = sample
+        if not isinstance(sample, (int, float)):
+            return      # Only the last value is kept of strings
+        self.count += 1
+        self.total += sample
+        if self.min is None or sample < self.min:
+            self.min = sample
+        if self.max is None or sample > self.max:
+            self.max = sample
+
+    def repeat(self):
+        # Unchanged registers count as another sample of the last value
+        if self.last is not None:
+            self.add(self.last)
+
+    def pop(self):
+        """Return the aggregate of the window, or None if there were no samples, and start a new window."""
+        if self.mode == ModbusAggregate.LAST or self.count == 0:
+            result = self.last
+        elif self.mode == ModbusAggregate.MEAN:
+            result = self.total / self.count
+        elif self.mode == ModbusAggregate.MIN:
+            result = self.min
+        else:
+            result = self.max
+        self.reset()
+        return result
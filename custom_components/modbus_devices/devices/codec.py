@@ -0,0 +1,161 @@
+import struct
+
+from .const import ByteOrder, WordOrder, ModbusDataType
+
+# struct formats for the sizes that have a native representation, by (type, register_count)
+_FORMATS = {
+    (ModbusDataType.INT, 1): "h",
+    (ModbusDataType.INT, 2): "i",
+    (ModbusDataType.INT, 4): "q",
+    (ModbusDataType.UINT, 1): "H",
+    (ModbusDataType.UINT, 2): "I",
+    (ModbusDataType.UINT, 4): "Q",
+    (ModbusDataType.FLOAT, 2): "f",
+    (ModbusDataType.FLOAT, 4): "d",
+}
+
+class ModbusCodec:
+    """Decoder and encoder for one datapoint, compiled for its type, size, scaling and the device byte/word order.
+
+    decode(buffer, offset) reads the value from a buffer of big-endian registers, as kept by read blocks.
+    encode(value) returns the registers to write.
+    """
+    __slots__ = ("byte_order", "word_order", "decode", "encode")
+
+    def __init__(self, dtype: ModbusDataType, register_count: int, scaling: float, offset: float,
+                 byte_order: ByteOrder = ByteOrder.MSB, word_order: WordOrder = WordOrder.NORMAL):
+        self.byte_order = byte_order
+        self.word_order = word_order
+
+        dtype = ModbusDataType(dtype)      # Drivers may give the type as a plain string
+        size = register_count * 2
+        swap_bytes = byte_order == ByteOrder.LSB
+        swap_words = word_order == WordOrder.SWAP and register_count > 1
+        is_string = dtype in (ModbusDataType.STRING1, ModbusDataType.STRING2)
+        fmt = _FORMATS.get((dtype, register_count))
+
+        # Registers as big-endian bytes, to and from the order the value is stored in
+        reorder = _reorder(register_count, swap_bytes, swap_words)
+        reorder_encode = _reorder(register_count, swap_bytes, swap_words and not is_string)
+        registers = struct.Struct(f">{register_count}H")
+
+        # Swapped byte and word order of a 32 bit value is the same as reading it little-endian
+        direct = fmt is not None and (reorder is None or (swap_bytes and (swap_words or register_count == 1) and register_count <= 2))
+        unpack_from = struct.Struct(("<" if swap_bytes else ">") + fmt).unpack_from if direct else None
+        unpack = struct.Struct(">" + fmt).unpack if fmt is not None else None
+        identity = scaling == 1 and offset == 0
+
+        def raw_bytes(buffer, pos):
+            data = bytes(buffer[pos:pos + size])
+            return reorder(data) if reorder is not None else data
+
+        if is_string:
+            low_bytes_only = dtype == ModbusDataType.STRING1
+
+            def decode(buffer, pos):
+                try:
+                    # For STRING1, take only the low byte of each register. Stop at first NULL byte and decode ASCII
+                    data = raw_bytes(buffer, pos)
+                    data = data[1::2] if low_bytes_only else data
+                    return data.split(b"\x00", 1)[0].decode("ascii", errors="ignore")
+                except Exception:
+                    return ''
+
+        elif dtype == ModbusDataType.FLOAT:
+            if direct:
+                get_raw = lambda buffer, pos: unpack_from(buffer, pos)[0]
+            elif unpack is not None:
+                get_raw = lambda buffer, pos: unpack(raw_bytes(buffer, pos))[0]
+            else:
+                # Fallback: treat as integer
+                get_raw = lambda buffer, pos: int.from_bytes(raw_bytes(buffer, pos), byteorder='big')
+
+            if identity and unpack is not None:
+                decode = get_raw
+            else:
+                decode = lambda buffer, pos: get_raw(buffer, pos) * scaling + offset
+
+        else:
+            signed = dtype == ModbusDataType.INT
+            if direct:
+                get_raw = lambda buffer, pos: unpack_from(buffer, pos)[0]
+            elif unpack is not None:
+                get_raw = lambda buffer, pos: unpack(raw_bytes(buffer, pos))[0]
+            else:
+                get_raw = lambda buffer, pos: int.from_bytes(raw_bytes(buffer, pos), byteorder='big', signed=signed)
+
+            if identity:
+                decode = get_raw
+            else:
+                def decode(buffer, pos):
+                    # Preserve float only when scaling/offset create a fractional part
+                    value = get_raw(buffer, pos) * scaling + offset
+                    return value if value % 1 != 0 else int(value)
+
+        def encode(value) -> list[int]:
+            if dtype in (ModbusDataType.INT, ModbusDataType.UINT):
+                scaled_value = int(round((value - offset) / scaling))
+                data = scaled_value.to_bytes(size, byteorder='big', signed=(dtype == ModbusDataType.INT))
+
+            elif dtype == ModbusDataType.FLOAT:
+                scaled_value = (value - offset) / scaling
+                if unpack is not None:
+                    data = struct.pack(">" + fmt, scaled_value)
+                else:
+                    data = int(round(scaled_value)).to_bytes(size, byteorder='big')
+
+            elif is_string:
+                # Encode string as ASCII
+                data = value.encode('ascii', errors='ignore')
+                if low_bytes_only:
+                    # 1 char per register → low byte only, pad each register
+                    data = bytes(x for c in data for x in (0x00, c))
+                # Pad to register_count*2
+                data = data.ljust(size, b'\x00')
+
+            else:
+                raise ValueError(f"Unsupported data type: {dtype}")
+
+            if len(data) != size:
+                # Strings longer than the datapoint are written in full
+                byteorder = 'little' if swap_bytes else 'big'
+                return [int.from_bytes(data[i:i + 2], byteorder=byteorder) for i in range(0, len(data), 2)]
+
+            if reorder_encode is not None:
+                data = reorder_encode(data)
+            return list(registers.unpack(data))
+
+        self.decode = decode
+        self.encode = encode
+
+def byte_permutation(register_count: int, byte_order: ByteOrder, word_order: WordOrder) -> list[int]:
+    # Position in the big-endian register buffer of each byte of the value, most significant first
+    reorder = _reorder(register_count, byte_order == ByteOrder.LSB, word_order == WordOrder.SWAP and register_count > 1)
+    positions = bytes(range(register_count * 2))
+    return list(reorder(positions) if reorder is not None else positions)
+
+def _reorder(register_count: int, swap_bytes: bool, swap_words: bool):
+    # Returns a function that converts between big-endian registers and the stored byte order, or None if they are the same.
+    # Both swaps are their own inverse, and commute, so the same function works in both directions.
+    if not (swap_bytes or swap_words):
+        return None
+
+    # Words are swapped within each pair of registers, an odd last register is left in place
+    order = list(range(register_count))
+    if swap_words:
+        for i in range(0, register_count - 1, 2):
+            order[i], order[i + 1] = order[i + 1], order[i]
+    slices = [slice(2 * r, 2 * r + 2) for r in order]
+    size = register_count * 2
+
+    def reorder(data: bytes) -> bytes:
+        if swap_words:
+            data = b"".join(data[s] for s in slices)
+        if swap_bytes:
+            swapped = bytearray(size)
+            swapped[0::2] = data[1::2]
+            swapped[1::2] = data[0::2]
+            data = bytes(swapped)
+        return data
+
+    return reorder
@@ -3,10 +3,11 @@ class ConnectionParams:
     pass
 
 class TCPConnectionParams(ConnectionParams):
-    def __init__(self, ip: str, port: int, slave_id: int = 1):
+    def __init__(self, ip: str, port: int, slave_id: int = 1, max_inflight: int = 1):
         self.ip = ip
         self.port = port
         self.slave_id = slave_id
+        self.max_inflight = max_inflight    # Number of requests that may be pipelined
 
 class RTUConnectionParams(ConnectionParams):
     def __init__(self, serial_port: str, baud_rate: int, slave_id: int = 1):
@@ -1,5 +1,12 @@
 from enum import Enum
 
+# Modbus exception code returned for addresses the device doesn't implement
+ILLEGAL_DATA_ADDRESS = 2
+
+# Exception codes some devices return instead, drivers can add them to unreadable_address_codes
+ILLEGAL_DATA_VALUE = 3
+SLAVE_DEVICE_FAILURE = 4
+
 class ByteOrder(str, Enum):
     MSB = 'MSB'
     LSB = 'LSB'
@@ -27,3 +34,9 @@ class ModbusPollMode(Enum):
     POLL_ON = 1             # Values will be read each poll interval
     POLL_ONCE = 2           # Just read them once, for example for static configuration
 
+class ModbusAggregate(Enum):
+    MEAN = 0                # Average of the samples in the window
+    MIN = 1                 # Lowest sample
+    MAX = 2                 # Highest sample
+    LAST = 3                # Last sample
+
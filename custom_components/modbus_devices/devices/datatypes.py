@@ -1,14 +1,15 @@
 import struct
 import uuid
 
-from .const import ByteOrder, WordOrder, ModbusDataType, ModbusMode, ModbusPollMode
+from .codec import ModbusCodec
+from .const import ByteOrder, WordOrder, ModbusAggregate, ModbusDataType, ModbusMode, ModbusPollMode
 from dataclasses import dataclass, field
 from enum import Enum
 
 ###########################################
 ###### DATA TYPES FOR HOME ASSISTANT ######
 ###########################################
-@dataclass
+@dataclass(slots=True)
 class EntityData:
     attrs: dict | None = None  # Home Assistant extra state attributes
     category: str = None                # None | "config" | "diagnostic"
@@ -16,33 +17,40 @@ class EntityData:
     enabledDefault: bool = True         # Entity enabled by default
     icon: str = None                    # None | "mdi:thermometer"....
 
-@dataclass
+@dataclass(slots=True)
 class EntityDataSensor(EntityData):
     precision: int | None = None                # None
     stateClass: str = None                      # None | Set to valid "SensorStateClass" to enable long term storage
     units: str = None                           # None | from homeassistant.const import UnitOf....
     enum: dict = field(default_factory=dict)    # String representation of integers
+    deadband: float | None = None               # None | Changes smaller than this are not published
+    deadband_relative: float | None = None      # None | Same, as a fraction of the last published value (0.01 = 1%)
+    max_publish_interval: float | None = None   # None | Seconds after which a value held back by the deadband is published anyway
+    history_windows: list[int] | None = None    # None | Windows in seconds for min/max/mean attributes, needs a datapoint history_size
 
-@dataclass
+@dataclass(slots=True)
 class EntityDataNumber(EntityData):
     units: str = None                   # None | from homeassistant.const import UnitOf....
     min_value: int = 0
     max_value: int = 65535
     step: int = 1
+    deadband: float | None = None               # None | Changes smaller than this are not published
+    deadband_relative: float | None = None      # None | Same, as a fraction of the last published value (0.01 = 1%)
+    max_publish_interval: float | None = None   # None | Seconds after which a value held back by the deadband is published anyway
 
-@dataclass
+@dataclass(slots=True)
 class EntityDataSelect(EntityData):
     options: dict = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class EntityDataBinarySensor(EntityData):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class EntityDataSwitch(EntityData):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class EntityDataButton(EntityData):
     pass
 
@@ -50,26 +58,39 @@ class EntityDataButton(EntityData):
 ###### DATA TYPES FOR MODBUS FUNCTIONALITY ######
 ################################################
 class ModbusGroup:
-    def __init__(self, mode: ModbusMode, poll_mode: ModbusPollMode):
+    def __init__(self, mode: ModbusMode, poll_mode: ModbusPollMode, poll_interval: int | None = None,
+                 min_interval: int | None = None, max_interval: int | None = None, aggregate: ModbusAggregate | None = None):
         # Initialize mode and poll_mode
         self.mode = mode
         self.poll_mode = poll_mode
+        # Seconds between polls for POLL_ON groups, None follows the device scan interval
+        self.poll_interval = poll_interval
+        # Bounds for adaptive polling, the interval moves between these depending on how often values change
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        # Sample at the fast scan interval, and publish this aggregate of the samples every scan interval
+        self.aggregate = aggregate
         # Generate a unique ID automatically when the instance is created
         self._unique_id = str(uuid.uuid4())
+        self._hash = hash(self._unique_id)
 
     @property
     def unique_id(self):
         return self._unique_id  # Return the auto-generated unique ID
 
+    @property
+    def adaptive(self) -> bool:
+        return self.min_interval is not None and self.max_interval is not None
+
     def __eq__(self, other):
-        # Ensure equality is based on mode and poll_mode
+        # Every group is distinct, even if another one has the same mode and poll_mode
         if isinstance(other, ModbusGroup):
-            return (self.mode == other.mode) and (self.poll_mode == other.poll_mode)
+            return self._unique_id == other._unique_id
         return False
 
     def __hash__(self):
-        # Hash based on mode, poll_mode, and unique_id to ensure uniqueness in dict
-        return hash((self.mode, self.poll_mode, self.unique_id))
+        # Precomputed from the unique_id, groups are looked up for every datapoint
+        return self._hash
     
 class ModbusDefaultGroups(Enum):
     CONFIG = ModbusGroup(ModbusMode.HOLDING, ModbusPollMode.POLL_OFF)
@@ -87,103 +108,114 @@ class ModbusDefaultGroups(Enum):
     def poll_mode(self):
         return self.value.poll_mode  # Access the poll_mode property directly
 
-@dataclass
+    @property
+    def poll_interval(self):
+        return self.value.poll_interval  # Access the poll_interval property directly
+
+    @property
+    def adaptive(self):
+        return self.value.adaptive  # Access the adaptive property directly
+
+    @property
+    def aggregate(self):
+        return self.value.aggregate  # Access the aggregate property directly
+
 class ModbusDatapoint:
-    address: int = 0                                            # 0-indexed address
-    register_count: int = 1                                     # Number of registers
-    scaling: float = 1                                          # Multiplier for raw value  
-    offset: float = 0.0                                         # Offset     
-    type: ModbusDataType = ModbusDataType.INT                   # Type of the datapoint
-    value: int | float | str = 0                                # Scaled value, usually "read only"
-    entity_data: EntityData | None = None                       # Entity parameters
+    """Address, type and scaling of a value. The current value lives in the device's value store once bound to it."""
+    __slots__ = ("address", "register_count", "scaling", "offset", "type", "entity_data", "fast_poll_threshold",
+                 "history_size", "_value", "_store", "slot", "_codec")
+
+    def __init__(self, address: int = 0, register_count: int = 1, scaling: float = 1, offset: float = 0.0,
+                 type: ModbusDataType = ModbusDataType.INT, value: int | float | str = 0,
+                 entity_data: EntityData | None = None, fast_poll_threshold: float | None = None,
+                 history_size: int = 0):
+        self.address = address                          # 0-indexed address
+        self.register_count = register_count            # Number of registers
+        self.scaling = scaling                          # Multiplier for raw value
+        self.offset = offset                            # Offset
+        self.type = type                                # Type of the datapoint
+        self.entity_data = entity_data                  # Entity parameters
+        self.fast_poll_threshold = fast_poll_threshold  # Switch to fast polling when the value crosses this
+        self.history_size = history_size                # Number of samples kept in memory, 0 keeps no history
+        self._value = value                             # Scaled value until bound to a value store
+        self._store = None                              # ModbusValueStore holding the value, see bind()
+        self.slot: int | None = None                    # Index of this datapoint in the value store
+        self._codec: ModbusCodec | None = None          # Compiled decoder/encoder
+
+    def __repr__(self):
+        return (f"ModbusDatapoint(address={self.address}, register_count={self.register_count}, scaling={self.scaling}, "
+                f"offset={self.offset}, type={self.type}, value={self.value!r}, entity_data={self.entity_data})")
+
+    @property
+    def value(self) -> int | float | str:
+        # Scaled value, usually "read only"
+        store = self._store
+        return store.values[self.slot] if store is not None else self._value
+
+    @value.setter
+    def value(self, value: int | float | str):
+        store = self._store
+        if store is not None:
+            slot = self.slot
+            if store.values[slot] != value:
+                store.changed.add(slot)
+            store.values[slot] = value
+        else:
+            self._value = value
+
+    def clone(self) -> "ModbusDatapoint":
+        # Copy for another device instance, sharing entity data and the compiled codec
+        dp = ModbusDatapoint(self.address, self.register_count, self.scaling, self.offset, self.type,
+                             self.value, self.entity_data, self.fast_poll_threshold, self.history_size)
+        dp._codec = self._codec
+        return dp
+
+    def bind(self, store, slot: int):
+        # Move the value into a slot of the device's value store
+        store.values[slot] = self.value
+        self._store = store
+        self.slot = slot
+        self._value = None
+
+    def compile(self, byte_order=ByteOrder.MSB, word_order=WordOrder.NORMAL) -> ModbusCodec:
+        # Must be called again if type, register_count, scaling or offset are changed after the first read
+        self._codec = ModbusCodec(self.type, self.register_count, self.scaling, self.offset, byte_order, word_order)
+        return self._codec
+
+    def from_buffer(self, buffer, offset: int = 0, byte_order=ByteOrder.MSB, word_order=WordOrder.NORMAL):
+        self.value = self.decode(buffer, offset, byte_order, word_order)
+
+    def decode(self, buffer, offset: int = 0, byte_order=ByteOrder.MSB, word_order=WordOrder.NORMAL):
+        # Decode straight from a buffer of big-endian registers, offset is in bytes
+        codec = self._codec
+        if codec is None or codec.byte_order is not byte_order or codec.word_order is not word_order:
+            codec = self.compile(byte_order, word_order)
+        return codec.decode(buffer, offset)
 
     def from_modbus(self, registers: list[int], byte_order=ByteOrder.MSB, word_order=WordOrder.NORMAL):
         # Convert from modbus registers to formatted value
         if len(registers) != self.register_count:
             raise ValueError(f"Datapoint at address {self.address}: expected {self.register_count} registers, got {len(registers)}")
-
-        # Convert registers to bytes with correct per-register byte order
-        b = bytearray()
-        for reg in registers:
-            b += reg.to_bytes(2, byteorder='big' if byte_order == ByteOrder.MSB else 'little')
-
-        # Apply word swap if needed
-        if word_order == WordOrder.SWAP and len(registers) > 1:
-            b = self.modbus_word_swap(b)
-
-        # Interpret bytes
-        if self.type in (ModbusDataType.INT , ModbusDataType.UINT ):
-            combined_value = int.from_bytes(b, byteorder='big', signed=(self.type == ModbusDataType.INT))
-            calculated_value = combined_value * self.scaling + self.offset
-            # Preserve float only when scaling/offset create a fractional part
-            if calculated_value % 1 != 0:
-                self.value = calculated_value
-            else:
-                self.value = int(calculated_value)
-
-        elif self.type == ModbusDataType.FLOAT:
-            if self.register_count == 2:
-                self.value = struct.unpack('>f', b)[0] * self.scaling + self.offset
-            elif self.register_count == 4:
-                self.value = struct.unpack('>d', b)[0] * self.scaling + self.offset
-            else:
-                # Fallback: treat as integer
-                combined_value = int.from_bytes(b, byteorder='big')
-                self.value = combined_value * self.scaling + self.offset
-
-        elif self.type in (ModbusDataType.STRING1, ModbusDataType.STRING2):
-            try:
-                # For STRING1, take only the low byte of each register
-                b_chars = b[1::2] if self.type == ModbusDataType.STRING1 else b
-                
-                # Stop at first NULL byte and decode ASCII
-                self.value = b_chars.split(b"\x00", 1)[0].decode("ascii", errors="ignore")
-            except Exception:
-                self.value = ''
+        self.from_buffer(struct.pack(f">{len(registers)}H", *registers), 0, byte_order, word_order)
 
     def to_modbus(self, value, byte_order=ByteOrder.MSB, word_order=WordOrder.NORMAL) -> list[int]:
         # Convert from formatted value to modbus registers
-        if self.type in (ModbusDataType.INT, ModbusDataType.UINT):
-            scaled_value = int(round((value - self.offset) / self.scaling))
-            b = scaled_value.to_bytes(self.register_count*2, byteorder='big', signed=(self.type == ModbusDataType.INT))
-
-        elif self.type == ModbusDataType.FLOAT:
-            scaled_value = (value - self.offset) / self.scaling
-            if self.register_count == 2:
-                b = struct.pack('>f', scaled_value)
-            elif self.register_count == 4:
-                b = struct.pack('>d', scaled_value)
-            else:
-                scaled_value = int(round(scaled_value))
-                b = scaled_value.to_bytes(self.register_count*2, byteorder='big')
-
-        elif self.type in (ModbusDataType.STRING1, ModbusDataType.STRING2):
-            # Encode string as ASCII
-            b = value.encode('ascii', errors='ignore')
-
-            if self.type == ModbusDataType.STRING1:
-                # 1 char per register → low byte only, pad each register
-                b = bytearray([x for c in b for x in (0x00, c)])
-
-            # Pad to register_count*2
-            b = b.ljust(self.register_count*2, b'\x00')
-
-        # Apply word swap if needed
-        if word_order == WordOrder.SWAP and self.register_count > 1 and self.type not in (ModbusDataType.STRING1, ModbusDataType.STRING2):
-            b = self.modbus_word_swap(b)
-
-        # Convert to registers with per-register byte order
-        registers = []
-        for i in range(0, len(b), 2):
-            registers.append(int.from_bytes(b[i:i+2], byteorder='big' if byte_order == ByteOrder.MSB else 'little'))
-
-        return registers
+        codec = self._codec
+        if codec is None or codec.byte_order is not byte_order or codec.word_order is not word_order:
+            codec = self.compile(byte_order, word_order)
+        return codec.encode(value)
     
-    def modbus_word_swap(self, b: bytes) -> bytes:
-        swapped = bytearray()
-        # Process 4-byte chunks
-        for i in range(0, len(b), 4):
-            chunk = b[i:i+4]
-            swapped.extend(chunk[2:4] + chunk[0:2] if len(chunk) == 4 else chunk)
-
-        return bytes(swapped)
\ No newline at end of file
+    def from_bits(self, bitmap: int, offset: int = 0):
+        self.value = self.decode_bits(bitmap, offset)
+
+    def decode_bits(self, bitmap: int, offset: int = 0) -> int:
+        # Take register_count bits from a packed bitmap, first bit is the least significant
+        return (bitmap >> offset) & ((1 << self.register_count) - 1)
+
+def pack_bits(bits: list[bool]) -> int:
+    # Pack bits as returned by coil/discrete input reads into an int, first bit is the least significant
+    bitmap = 0
+    for i, bit in enumerate(bits):
+        if bit:
+            bitmap |= 1 << i
+    return bitmap
@@ -0,0 +1,66 @@
+from array import array
+
+class ModbusHistory:
+    """Fixed size ring buffer of (timestamp, value) samples of one numeric datapoint.
+
+    Backed by two arrays of doubles that are allocated once, so adding a sample never allocates.
+    Timestamps are time.time(), samples are kept in the order they were read.
+    """
+    __slots__ = ("size", "timestamps", "values", "_next", "_count", "_changed_at")
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError(f"History size must be at least 1, got {size}")
+        self.size = size
+        self.timestamps = array("d", bytes(8 * size))
+        self.values = array("d", bytes(8 * size))
+        self._next = 0                      # Index the next sample is written to
+        self._count = 0                     # Number of samples in the buffer
+        self._changed_at: float | None = None   # Timestamp of the last sample that differed from the one before it
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp: float, value):
+        # Strings, None and other non-numeric values are not kept
+        if not isinstance(value, (int, float)):
+            return
+        if self._count == 0 or self.values[self._next - 1] != value:
+            self._changed_at = timestamp
+
+        self.timestamps[self._next] = timestamp
+        self.values[self._next] = value
+        self._next = (self._next + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+
+    def _indices(self, since: float | None = None):
+        # Indices of the samples from oldest to newest, optionally only those taken at or after since
+        start = (self._next - self._count) % self.size
+        indices = [(start + i) % self.size for i in range(self._count)]
+        if since is not None:
+            timestamps = self.timestamps
+            indices = [i for i in indices if timestamps[i] >= since]
+        return indices
+
+    def samples(self, since: float | None = None) -> list[tuple[float, float]]:
+        """Return the (timestamp, value) samples, oldest first."""
+        return [(self.timestamps[i], self.values[i]) for i in self._indices(since)]
+
+    def stats(self, window: float, now: float) -> dict | None:
+        """Return min, max and mean of the samples in the last window seconds, or None if there are none."""
+        values = self.values
+        window_values = [values[i] for i in self._indices(now - window)]
+        if not window_values:
+            return None
+        return {
+            "min": min(window_values),
+            "max": max(window_values),
+            "mean": sum(window_values) / len(window_values),
+            "count": len(window_values),
+        }
+
+    @property
+    def last_change(self) -> float | None:
+        """Timestamp of the sample where the value last changed."""
+        return self._changed_at
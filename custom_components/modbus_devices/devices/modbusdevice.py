@@ -1,4 +1,7 @@
+import asyncio
 import logging
+import struct
+import time
 
 from enum import Enum
 from homeassistant.helpers.entity import EntityCategory
@@ -7,9 +10,15 @@ from pymodbus.client import AsyncModbusTcpClient
 from pymodbus.exceptions import ModbusException
 
 from .connection import ConnectionParams, TCPConnectionParams, RTUConnectionParams
-from .const import ByteOrder, WordOrder, ModbusMode, ModbusPollMode
-from .datatypes import ModbusDefaultGroups, ModbusGroup, ModbusDatapoint
+from .aggregate import ModbusAggregator
+from .const import ByteOrder, WordOrder, ModbusMode, ModbusPollMode, ILLEGAL_DATA_ADDRESS
+from .datatypes import ModbusDefaultGroups, ModbusGroup, ModbusDatapoint, pack_bits
 from .datatypes import EntityDataSelect, EntityDataNumber, EntityDataSensor
+from .history import ModbusHistory
+from .readplan import ModbusReadBlock, build_read_plan, BIT_MODES
+from .scheduler import ModbusPollScheduler, SCHEDULE_TOLERANCE
+from .valuestore import ModbusValueStore, NEVER
+from .vectorized import SCALAR, build_vector_decoder
 from ..rtu_bus import RTUBusManager, RTUBusClient
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,10 +33,30 @@ class ModbusDevice():
     # Settings
     byte_order = ByteOrder.MSB
     word_order = WordOrder.NORMAL
+    max_read_gap = 0            # Max number of unused registers bridged when merging groups into one read
+    unreadable_address_codes = (ILLEGAL_DATA_ADDRESS,)  # Exception codes meaning a request spans addresses the device doesn't implement
+    read_retries = 2            # Extra attempts for a failed read request within one poll cycle
+    retry_delay = 0.1           # Seconds before the first retry, doubled for every further attempt
+    config_max_age = 300        # Seconds a prefetched CONFIG value is served without reading it again
+    vectorized_decode = True    # Decode blocks with many numeric datapoints in one go when NumPy is installed
+    skip_unused_datapoints = True   # Don't poll datapoints whose entities are disabled, set to False if onAfterRead needs them
+    share_definitions = True    # Load datapoints once per driver class, set to False if the driver changes entity data at runtime
+    refresh_groups: dict = {}   # Groups to read again after a write to a group, {GROUP: [GROUP, OTHER_GROUP]}, default is the written group
+    write_refreshes = 5         # Max number of refreshes after a write, they stop early when nothing changes
+
+    # Datapoints as loaded by each driver class, copied for every instance
+    _definitions: dict[type, dict[ModbusGroup, dict[str, ModbusDatapoint]]] = {}
 
     def __init__(self, connection_params: ConnectionParams, rtu_bus: RTUBusManager):
+        # Extra connections used to pipeline reads, pymodbus only handles one request per connection
+        self._pipeline_clients = []
+
         if isinstance(connection_params, TCPConnectionParams):
             self._client = AsyncModbusTcpClient(host=connection_params.ip, port=connection_params.port)
+            self._pipeline_clients = [
+                AsyncModbusTcpClient(host=connection_params.ip, port=connection_params.port)
+                for _ in range(connection_params.max_inflight - 1)
+            ]
         elif isinstance(connection_params, RTUConnectionParams):
             self._client = RTUBusClient(rtu_bus)
         else:
@@ -35,21 +64,38 @@ class ModbusDevice():
         self._slave_id = connection_params.slave_id
 
         self.Datapoints: dict[ModbusGroup, dict[str, ModbusDatapoint]] = {}
-        self.loadDatapoints()
-        self.loadConfigUI()
+        self.valueStore = ModbusValueStore()     # Current values, read times and read blocks of all datapoints
+        self.unreadableAddresses: dict[ModbusMode, set[int]] = {}      # Learned holes, never included in reads
+        self.unreadableAddressesChanged = False
+        self._usedDatapoints: set[tuple[str, str]] | None = None    # (group unique_id, key) with an entity in use, None until known
+        self._scheduler = ModbusPollScheduler(default_interval=0)    # Read all groups every cycle until told otherwise
+        self.loadDefinition()
+        self.bindDatapoints()
+        self.invalidateReadPlan()
         _LOGGER.debug("Loaded datapoints for %s %s", self.manufacturer, self.model)
 
         self.firstRead = True
+        self.fastPollRequested = False      # Set when a datapoint crosses its fast_poll_threshold
+        self._changedGroups: set[str] = set()
+        self._urgentGroups: set[str] = set()
+        self.failedGroups: dict[str, int] = {}     # Consecutive failed polls per group unique_id
+        self._aggregateWindowStart: float | None = None    # When the samples of aggregating groups were last published
+
+        # Datapoints whose value changed in the last readData, as (group unique_id, key)
+        self.changedKeys: set[tuple[str, str]] = set()
 
     def close(self):
         """Close the underlying client safely."""
         try:
             _LOGGER.debug("Shutting down and disconnecting device: %s %s",  self.manufacturer, self.model)
             self._client.close()
+            for client in self._pipeline_clients:
+                client.close()
         except Exception as e:
             _LOGGER.warning("Error closing client for device %s %s: %s", self.manufacturer, self.model, e)
         finally:
             self._client = None
+            self._pipeline_clients = []
 
     def loadConfigUI(self):
         # Ensure default groups exist
@@ -72,6 +118,109 @@ class ModbusDevice():
     def loadDatapoints(self):
         pass
 
+    def loadDefinition(self):
+        # Load datapoints, or copy them from the definition shared by all instances of this driver
+        if not self.share_definitions:
+            self.loadDatapoints()
+            self.loadConfigUI()
+            self.compileCodecs()
+            return
+
+        definition = ModbusDevice._definitions.get(type(self))
+        if definition is None:
+            self.loadDatapoints()
+            self.loadConfigUI()
+            self.compileCodecs()
+            definition = ModbusDevice._definitions[type(self)] = self.Datapoints
+
+        self.Datapoints = {group: {key: dp.clone() for key, dp in datapoints.items()} for group, datapoints in definition.items()}
+
+    def getHandle(self, group: ModbusGroup, key: str) -> int:
+        # Index of the datapoint in the value store, stable for the lifetime of the device
+        return self.valueStore.bind(self.Datapoints[group][key])
+
+    def getHistory(self, group: ModbusGroup, key: str) -> ModbusHistory | None:
+        # Samples of the datapoint, None unless it has a history_size
+        return self.valueStore.histories.get(self.getHandle(group, key))
+
+    def bindDatapoints(self):
+        # Give all datapoints a slot in the value store, datapoints added later are bound when read
+        for group, datapoints in self.Datapoints.items():
+            for dp in datapoints.values():
+                slot = self.valueStore.bind(dp)
+                if group.aggregate is not None and slot not in self.valueStore.aggregators:
+                    self.valueStore.aggregators[slot] = ModbusAggregator(group.aggregate)
+
+    def compileCodecs(self):
+        # Precompile decoding of all datapoints, datapoints added later are compiled on their first read.
+        # Read plans are rebuilt too, since vectorized decoders capture scaling and offset
+        for datapoints in self.Datapoints.values():
+            for dp in datapoints.values():
+                dp.compile(self.byte_order, self.word_order)
+        self.invalidateReadPlan()
+
+    def invalidateReadPlan(self):
+        # Must be called whenever groups or datapoints are added, removed or moved
+        self._readPlans: dict[tuple, list[ModbusReadBlock]] = {}
+
+    def getReadPlan(self, groups, only_used: bool = False) -> list[ModbusReadBlock]:
+        key = (only_used, *(group.unique_id for group in groups))
+        plan = self._readPlans.get(key)
+        if plan is None:
+            datapoints = self._usedDatapointsOnly() if only_used else self.Datapoints
+            plan = build_read_plan(datapoints, groups, self.max_read_gap, self.unreadableAddresses)
+            for block in plan:
+                for _, _, dp in block.datapoints:
+                    self.valueStore.bind(dp)
+            if self.vectorized_decode:
+                for block in plan:
+                    if block.mode not in BIT_MODES:
+                        block.vector = build_vector_decoder(block, self.byte_order, self.word_order)
+            self._readPlans[key] = plan
+        return plan
+
+    def setDatapointUsed(self, group: ModbusGroup, key: str, used: bool):
+        # Called when the entity of a datapoint is added to or removed from Home Assistant
+        if self._usedDatapoints is None:
+            self._usedDatapoints = set()
+
+        item = (group.unique_id, key)
+        if used == (item in self._usedDatapoints):
+            return
+        if used:
+            self._usedDatapoints.add(item)
+        else:
+            self._usedDatapoints.discard(item)
+        if self.skip_unused_datapoints:
+            self.invalidateReadPlan()
+
+    def _usedDatapointsOnly(self) -> dict[ModbusGroup, dict[str, ModbusDatapoint]]:
+        # Datapoints without an entity are always kept, drivers use them for device info and calculations
+        if not self.skip_unused_datapoints or self._usedDatapoints is None or self.firstRead:
+            return self.Datapoints
+        used = self._usedDatapoints
+        return {
+            group: {key: dp for key, dp in datapoints.items() if dp.entity_data is None or (group.unique_id, key) in used}
+            for group, datapoints in self.Datapoints.items()
+        }
+
+    def setUnreadableAddresses(self, addresses: dict[ModbusMode, set[int]]):
+        # Load previously learned holes, for instance from storage
+        self.unreadableAddresses = {mode: set(addrs) for mode, addrs in addresses.items()}
+        self.invalidateReadPlan()
+
+    def setPollInterval(self, seconds: float, sample_seconds: float | None = None):
+        # Interval used for POLL_ON groups that don't define their own poll_interval.
+        # Aggregating groups are sampled every sample_seconds, and publish their aggregate every seconds
+        self._scheduler.default_interval = seconds
+        self._scheduler.sample_interval = sample_seconds
+
+    def secondsUntilNextPoll(self) -> float | None:
+        next_due = self._scheduler.nextDue()
+        if next_due is None:
+            return None
+        return max(0.0, next_due - time.monotonic())
+
     """ ******************************************************* """
     """ ************* FUNCTIONS CALLED ON EVENTS ************** """
     """ ******************************************************* """
@@ -85,80 +234,333 @@ class ModbusDevice():
     """ ******************************************************* """
     """ *********** EXTERNAL CALL TO READ ALL DATA ************ """
     """ ******************************************************* """
-    async def readData(self):
+    async def readData(self, all_groups: bool = False):
+        """Read all groups that are due, or every polled group if all_groups is set."""
         if self.firstRead:      
             await self._client.connect() 
+            for client in self._pipeline_clients:
+                await client.connect()
 
         self.onBeforeRead()
 
-        try:
-            for group, _ in self.Datapoints.items():
-                if group.poll_mode == ModbusPollMode.POLL_ON:
-                    await self.readGroup(group)
-                elif group.poll_mode == ModbusPollMode.POLL_ONCE and self.firstRead:
-                    await self.readGroup(group)
-        except Exception as err:
-            raise
+        now = time.monotonic()
+        polled = [group for group in self.Datapoints if group.poll_mode == ModbusPollMode.POLL_ON]
+
+        if self.firstRead or all_groups:
+            groups = [
+                group for group in self.Datapoints
+                if group.poll_mode == ModbusPollMode.POLL_ON
+                or (group.poll_mode == ModbusPollMode.POLL_ONCE and self.firstRead)
+            ]
+            self._scheduler.reset(polled, now)
+        else:
+            due = {group.unique_id for group in self._scheduler.popDue(now)}
+            groups = [group for group in polled if group.unique_id in due]
+
+        self._changedGroups.clear()
+        self._urgentGroups.clear()
+        self.changedKeys = set()
+
+        plan = self.getReadPlan(groups, only_used=True)
+        errors = await self.readPlan(plan)
+
+        # A failed request only affects the groups it covers, the rest of the cycle is still valid
+        failed = {group.unique_id for block, error in zip(plan, errors) if error is not None for group in block.groups}
+        for group in groups:
+            if group.unique_id in failed:
+                self.failedGroups[group.unique_id] = self.failedGroups.get(group.unique_id, 0) + 1
+                if not self.firstRead:
+                    self._scheduler.backoff(group, self.failedGroups[group.unique_id])
+            else:
+                self.failedGroups.pop(group.unique_id, None)
+                self._scheduler.adapt(group, group.unique_id in self._changedGroups, group.unique_id in self._urgentGroups)
+
+        # Give up on the cycle if nothing could be read, or if the first read is incomplete
+        first_error = next((error for error in errors if error is not None), None)
+        if first_error is not None and (self.firstRead or all(error is not None for error in errors)):
+            raise first_error
 
         if self.firstRead:   
             self.firstRead = False
             self.onAfterFirstRead()
+            self.bindDatapoints()
+            self.invalidateReadPlan()       # onAfterFirstRead may add groups
+            self._scheduler.sync([group for group in self.Datapoints if group.poll_mode == ModbusPollMode.POLL_ON], now)
+
+        if self.valueStore.aggregators:
+            self.publishAggregates(now)
 
         self.onAfterRead()
 
+    def publishAggregates(self, now: float):
+        """Set the values of aggregating groups to the aggregate of their samples, once per publish window."""
+        window = self._scheduler.default_interval
+        if self._aggregateWindowStart is not None and now - self._aggregateWindowStart < window - SCHEDULE_TOLERANCE:
+            return
+        first_publish = self._aggregateWindowStart is None
+        self._aggregateWindowStart = now
+
+        aggregators = self.valueStore.aggregators
+        for group, datapoints in self.Datapoints.items():
+            if group.aggregate is None:
+                continue
+            for name, dp in datapoints.items():
+                aggregator = aggregators.get(dp.slot) if dp._store is self.valueStore else None
+                if aggregator is None:
+                    continue
+                old_value = dp.value
+                value = aggregator.pop()
+                if value is None or value == old_value:
+                    continue
+                dp.value = value
+                self.changedKeys.add((group.unique_id, name))
+                if not first_publish and self._crossedThreshold(dp, old_value):
+                    _LOGGER.debug("Datapoint %s crossed its fast poll threshold (%s -> %s)", name, old_value, dp.value)
+                    self.fastPollRequested = True
+
+    def updateTimeout(self) -> float | None:
+        """Longest a readData of all polled groups may take, or None if the client has no per-request deadlines."""
+        request_timeout = getattr(self._client, "request_timeout", None)
+        if request_timeout is None:
+            return None
+
+        groups = [
+            group for group in self.Datapoints
+            if group.poll_mode == ModbusPollMode.POLL_ON or (group.poll_mode == ModbusPollMode.POLL_ONCE and self.firstRead)
+        ]
+        retry_delays = sum(self.retry_delay * 2 ** attempt for attempt in range(self.read_retries))
+        total = sum(
+            request_timeout(self._slave_id, block.count, block.mode in BIT_MODES) * (self.read_retries + 1) + retry_delays
+            for block in self.getReadPlan(groups, only_used=True)
+        )
+        # Twice that, since learning unreadable addresses adds requests
+        return 2 * total
+
     """ ******************************************************* """
     """ ******************** READ GROUP *********************** """
     """ ******************************************************* """
     async def readGroup(self, group: ModbusGroup):
         """Read Modbus group registers and update data points."""
-        MAX_REGISTERS_PER_READ = 125
+        for block in self.getReadPlan([group]):
+            await self.readBlock(block)
+
+    async def prefetchGroup(self, group: ModbusGroup):
+        """Read a whole group in as few requests as possible, so readValue can be served from cache.
+        Raises the first error if any request failed."""
+        _LOGGER.debug("Prefetching group %s", group)
+        errors = [error for error in await self.readPlan(self.getReadPlan([group])) if error is not None]
+        if errors:
+            raise errors[0]
+
+    async def readPlan(self, plan: list[ModbusReadBlock]) -> list[Exception | None]:
+        """Read all planned requests, returning the error of each request or None if it succeeded."""
+        if self._pipeline_clients and len(plan) > 1:
+            return await self.readBlocksPipelined(plan)
+        return [await self.readBlockWithRetry(block) for block in plan]
+
+    async def readBlocksPipelined(self, plan: list[ModbusReadBlock]) -> list[Exception | None]:
+        """Read all planned requests concurrently, limited by the number of connections."""
+        idle_clients = asyncio.Queue()
+        for client in [self._client, *self._pipeline_clients]:
+            idle_clients.put_nowait(client)
+
+        async def read(block: ModbusReadBlock):
+            client = await idle_clients.get()
+            try:
+                return await self.readBlockWithRetry(block, client)
+            finally:
+                idle_clients.put_nowait(client)
 
-        addresses = [
-            (dp.address, dp.register_count)
-            for dp in self.Datapoints[group].values()
-        ]
-        start_addr = min(addr for addr, _ in addresses)
-        end_addr = max(addr + register_count for addr, register_count in addresses)
-        n_reg = end_addr - start_addr
-
-        if n_reg > MAX_REGISTERS_PER_READ:
-            raise ValueError(
-                f"Too many registers to read at once ({n_reg} requested, max {MAX_REGISTERS_PER_READ}) "
-                f"for group {group}. Consider splitting the group."
-        )
+        return await asyncio.gather(*(read(block) for block in plan))
 
-        method = self._get_read_method(group.mode)    
-        response = await method(address=start_addr, count=n_reg, device_id=self._slave_id)
+    async def readBlockWithRetry(self, block: ModbusReadBlock, client=None) -> Exception | None:
+        """Read one planned request, retrying with exponential backoff. Returns the last error if all attempts failed."""
+        for attempt in range(self.read_retries + 1):
+            try:
+                await self.readBlock(block, client)
+                return None
+            except Exception as exc:
+                error = exc
+                if attempt < self.read_retries:
+                    _LOGGER.debug("Read of %s at %s failed (attempt %s), retrying: %s", block.mode.name, block.address, attempt + 1, exc)
+                    await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+        _LOGGER.warning("Failed to read groups %s at %s address %s: %s", block.groups, block.mode.name, block.address, error)
+        return error
+
+    async def readBlock(self, block: ModbusReadBlock, client=None, learn: bool = True):
+        """Read one planned request and update the data points it covers."""
+        method = self._get_read_method(block.mode, client)
+        response = await method(address=block.address, count=block.count, device_id=self._slave_id)
+
+        # If the request spans unused registers the device refuses, find them and read around them
+        if response.isError() and learn and getattr(response, "exception_code", None) in self.unreadable_address_codes:
+            if await self._learnUnreadableAddresses(block, client):
+                for sub_block in self._replanBlock(block):
+                    await self.readBlock(sub_block, client, learn=False)
+                return
 
         # Handle Modbus errors
         if response.isError():
-            raise ModbusException(f"Error reading group {group}: {response}")
+            raise ModbusException(f"Error reading groups {block.groups}: {response}")
+
+        old_raw = block.raw
+        bits = block.mode in BIT_MODES
+        if bits:
+            # Keep bits packed, datapoints index straight into the bitmap
+            raw = pack_bits(response.bits[:block.count])
+            _LOGGER.debug("Read bits from address: %s - %s", block.address, bin(raw))
+        else:
+            data = response.registers
+            raw = struct.pack(f">{len(data)}H", *data)
+            _LOGGER.debug("Read data from address: %s - %s", block.address, data)
 
-        data = response.bits if group.mode in (ModbusMode.COILS, ModbusMode.DISCRETE_INPUTS) else response.registers
-        _LOGGER.debug("Read data from address: %s - %s", start_addr, data)
+        # Compare against the previous response of this block, so unchanged datapoints aren't decoded again
+        # The response is only kept once all datapoints are decoded, so a decode error doesn't hide changes next time
+        unchanged_block = old_raw == raw
+        if not bits and old_raw is not None and not unchanged_block:
+            old_view, new_view = memoryview(old_raw), memoryview(raw)
+
+        # Decode all numeric datapoints at once when the block is large enough
+        values = block.vector.decode(raw) if block.vector is not None and not unchanged_block else None
 
         # Process the registers and update data points
-        for name, dp in self.Datapoints[group].items():
-            offset = dp.address - start_addr
-            registers = data[offset:offset + dp.register_count]
+        read_at = time.monotonic()
+        timestamps, sources = self.valueStore.timestamps, self.valueStore.sources
+        aggregators = self.valueStore.aggregators
+        for i, (group, name, dp) in enumerate(block.datapoints):
+            offset = dp.address - block.address
+            slot = dp.slot
+            timestamps[slot] = read_at
+            aggregator = aggregators.get(slot) if aggregators else None
+
+            if old_raw is not None and sources[slot] is block:
+                if (unchanged_block
+                        or (bits and not ((old_raw ^ raw) >> offset) & ((1 << dp.register_count) - 1))
+                        or (not bits and old_view[offset * 2:(offset + dp.register_count) * 2] == new_view[offset * 2:(offset + dp.register_count) * 2])):
+                    if aggregator is not None:
+                        aggregator.repeat()
+                    continue
 
             try:
-                dp.from_modbus(registers, self.byte_order, self.word_order)
+                if bits:
+                    value = dp.decode_bits(raw, offset)
+                elif values is not None and values[i] is not SCALAR:
+                    value = values[i]
+                else:
+                    value = dp.decode(raw, offset * 2, self.byte_order, self.word_order)
             except Exception as exc:
-                _LOGGER.warning("Failed to decode datapoint %s in group %s (addr=%s len=%s raw=%s)", name, group, dp.address, dp.register_count, registers, exc_info=exc)
+                raw_value = bin(raw >> offset) if bits else data[offset:offset + dp.register_count]
+                _LOGGER.warning("Failed to decode datapoint %s in group %s (addr=%s len=%s raw=%s)", name, group, dp.address, dp.register_count, raw_value, exc_info=exc)
                 raise
+            sources[slot] = block
+
+            # Samples of aggregating groups are only published as an aggregate, see publishAggregates
+            if aggregator is not None:
+                aggregator.add(value)
+                continue
+
+            old_value = dp.value
+            dp.value = value
+
+            if dp.value != old_value:
+                self.changedKeys.add((group.unique_id, name))
+                self._changedGroups.add(group.unique_id)
+                if not self.firstRead and self._crossedThreshold(dp, old_value):
+                    _LOGGER.debug("Datapoint %s crossed its fast poll threshold (%s -> %s)", name, old_value, dp.value)
+                    self._urgentGroups.add(group.unique_id)
+                    self.fastPollRequested = True
+
+        block.raw = raw
+
+        # Every successful read is a sample, also for values that didn't change
+        if self.valueStore.histories:
+            sampled_at = time.time()
+            for _, _, dp in block.datapoints:
+                self.valueStore.record(dp, sampled_at)
+
+    async def _learnUnreadableAddresses(self, block: ModbusReadBlock, client=None) -> bool:
+        """Bisect a refused request to find which unused registers the device can't read."""
+        used = set()
+        for _, _, dp in block.datapoints:
+            used.update(range(dp.address, dp.address + dp.register_count))
+        if len(used) == block.count:
+            return False    # No unused registers, so a datapoint itself is unreadable
+
+        # Split the block into units: runs of used registers are kept whole, unused registers stand alone
+        units: list[tuple[int, int, bool]] = []
+        for address in range(block.address, block.end):
+            is_used = address in used
+            if units and is_used and units[-1][2] and units[-1][1] == address:
+                units[-1] = (units[-1][0], address + 1, True)
+            else:
+                units.append((address, address + 1, is_used))
+
+        method = self._get_read_method(block.mode, client)
+        holes = set()
+
+        async def probe(first: int, last: int, known_bad: bool = False):
+            start, end = units[first][0], units[last - 1][1]
+            if not known_bad:
+                response = await method(address=start, count=end - start, device_id=self._slave_id)
+                if not response.isError():
+                    return
+                if getattr(response, "exception_code", None) not in self.unreadable_address_codes:
+                    raise ModbusException(f"Error while probing addresses {start}-{end - 1}: {response}")
+            if last - first == 1:
+                if units[first][2]:
+                    raise ModbusException(f"Datapoint address {start} is not readable")
+                holes.add(start)
+                return
+            middle = (first + last) // 2
+            await probe(first, middle)
+            await probe(middle, last)
+
+        # The whole block is already known to fail
+        await probe(0, len(units), known_bad=True)
+        if not holes:
+            return False    # Every part could be read on its own, so the refusal wasn't caused by an address
+
+        _LOGGER.info("Learned unreadable %s addresses for %s %s: %s", block.mode.name, self.manufacturer, self.model, sorted(holes))
+        self.unreadableAddresses.setdefault(block.mode, set()).update(holes)
+        self.unreadableAddressesChanged = True
+        self.invalidateReadPlan()
+        return True
+
+    def _replanBlock(self, block: ModbusReadBlock) -> list[ModbusReadBlock]:
+        # Plan only the datapoints of this block, now avoiding the learned holes
+        datapoints: dict[ModbusGroup, dict[str, ModbusDatapoint]] = {}
+        for group, name, dp in block.datapoints:
+            datapoints.setdefault(group, {})[name] = dp
+        return build_read_plan(datapoints, list(datapoints), self.max_read_gap, self.unreadableAddresses)
+
+    def _crossedThreshold(self, dp: ModbusDatapoint, old_value) -> bool:
+        threshold = dp.fast_poll_threshold
+        if threshold is None:
+            return False
+        try:
+            return (old_value < threshold) != (dp.value < threshold)
+        except TypeError:
+            return False
 
     """ ******************************************************* """
     """ **************** READ SINGLE VALUE ******************** """
     """ ******************************************************* """
-    async def readValue(self, group: ModbusGroup, key: str) -> float | str:
+    async def readValue(self, group: ModbusGroup, key: str, max_age: float | None = None) -> float | str:
+        """Read a single value, or return the cached value if it was read less than max_age seconds ago."""
         _LOGGER.debug("Reading value: Group: %s, Key: %s", group, key)
 
         if key not in self.Datapoints[group]:
             raise KeyError(f"Key '{key}' not found in group '{group}'")
 
         dp = self.Datapoints[group][key]
+        if max_age is not None and self.valueAge(group, key) <= max_age:
+            _LOGGER.debug("Using cached value for key '%s': %s", key, dp.value)
+            return dp.value
+
         register_count = dp.register_count
+        self.valueStore.bind(dp)
+        self.valueStore.invalidate(dp)
 
         method = self._get_read_method(group.mode) 
         response = await method(address=dp.address, count=register_count, device_id=self._slave_id)
@@ -167,18 +569,31 @@ class ModbusDevice():
         if response.isError():
             raise ModbusException(f"Error reading value for key '{key}': {response}")
 
-        data = response.bits if group.mode in (ModbusMode.COILS, ModbusMode.DISCRETE_INPUTS) else response.registers
-        _LOGGER.debug("Read data: %s", data)
-        registers = data[:register_count]
+        if group.mode in BIT_MODES:
+            registers = response.bits[:register_count]
+        else:
+            registers = response.registers[:register_count]
+        _LOGGER.debug("Read data: %s", registers)
         
         try:
-            dp.from_modbus(registers, self.byte_order, self.word_order)
+            if group.mode in BIT_MODES:
+                dp.from_bits(pack_bits(registers))
+            else:
+                dp.from_modbus(registers, self.byte_order, self.word_order)
         except Exception as exc:
             _LOGGER.warning("Failed to decode datapoint %s in group %s (addr=%s len=%s raw=%s)", key, group, dp.address, dp.register_count, registers, exc_info=exc)
             raise
+        self.valueStore.timestamps[dp.slot] = time.monotonic()
+        self.valueStore.record(dp, time.time())
 
         return dp.value
 
+    def valueAge(self, group: ModbusGroup, key: str) -> float:
+        # Seconds since the value was read from the device, infinite if it never was or has been written since
+        dp = self.Datapoints[group][key]
+        read_at = self.valueStore.timestamps[dp.slot] if dp.slot is not None else NEVER
+        return time.monotonic() - read_at
+
     """ ******************************************************* """
     """ **************** WRITE SINGLE VALUE ******************* """
     """ ******************************************************* """
@@ -222,19 +637,49 @@ class ModbusDevice():
         if response.isError():
             raise ModbusException(f"Failed to write value for key '{key}': {response}")
 
-        # Update the cached value
+        # Update the cached value, and make sure the next poll or readValue gets it from the device again
         datapoint.value = value
+        self.valueStore.invalidate(datapoint)
         _LOGGER.debug("Successfully wrote value for key '%s': %s", key, value)
 
+    def getRefreshGroups(self, group: ModbusGroup, key: str) -> list[ModbusGroup]:
+        """Groups that may have changed after writing key in group. Override if it depends on the key."""
+        if group in self.refresh_groups:
+            return list(self.refresh_groups[group])
+        # Groups that aren't polled, such as CONFIG, only have the written value read again
+        return [group] if group.poll_mode == ModbusPollMode.POLL_ON else []
+
+    async def refreshWritten(self, written: list[tuple[ModbusGroup, str]]) -> bool:
+        """Read again what the given writes may have changed, returns True if any value changed."""
+        groups = list(dict.fromkeys(g for group, key in written for g in self.getRefreshGroups(group, key) if g.mode != ModbusMode.NONE))
+        datapoints = [dp for group in groups for dp in self.Datapoints.get(group, {}).values()]
+        datapoints += [self.Datapoints[group][key] for group, key in written if group not in groups]
+        before = [dp.value for dp in datapoints]
+
+        errors = await self.readPlan(self.getReadPlan(groups, only_used=True)) if groups else []
+        for group, key in written:
+            if group not in groups:
+                await self.readValue(group, key)
+
+        # Derived values follow the refreshed ones, as after a poll
+        if not errors or any(error is None for error in errors):
+            self.onAfterRead()
+
+        error = next((error for error in errors if error is not None), None)
+        if error is not None:
+            raise error
+        return any(dp.value != value for dp, value in zip(datapoints, before))
+
     """ ******************************************************* """
     """ *********** HELPER FOR PROCESSING REGISTERS *********** """
     """ ******************************************************* """
-    def _get_read_method(self, mode: ModbusMode):
+    def _get_read_method(self, mode: ModbusMode, client=None):
+        client = client or self._client
         dispatch = {
-            ModbusMode.INPUT:           self._client.read_input_registers,
-            ModbusMode.DISCRETE_INPUTS: self._client.read_discrete_inputs,
-            ModbusMode.HOLDING:         self._client.read_holding_registers,
-            ModbusMode.COILS:           self._client.read_coils,
+            ModbusMode.INPUT:           client.read_input_registers,
+            ModbusMode.DISCRETE_INPUTS: client.read_discrete_inputs,
+            ModbusMode.HOLDING:         client.read_holding_registers,
+            ModbusMode.COILS:           client.read_coils,
         }
 
         try:
@@ -0,0 +1,139 @@
+import bisect
+import logging
+
+from dataclasses import dataclass, field
+
+from .const import ModbusMode, ModbusPollMode
+from .datatypes import ModbusGroup, ModbusDatapoint
+
+_LOGGER = logging.getLogger(__name__)
+
+# Protocol limits for one read request
+MAX_REGISTERS_PER_READ = 125
+MAX_BITS_PER_READ = 2000
+
+# Modes where every address is a single bit
+BIT_MODES = (ModbusMode.COILS, ModbusMode.DISCRETE_INPUTS)
+
+def max_read_count(mode: ModbusMode) -> int:
+    return MAX_BITS_PER_READ if mode in BIT_MODES else MAX_REGISTERS_PER_READ
+
+@dataclass
+class ModbusReadBlock:
+    mode: ModbusMode                                            # Function code used for the read
+    address: int                                                # First address in the request
+    count: int                                                  # Number of registers in the request
+    datapoints: list[tuple[ModbusGroup, str, ModbusDatapoint]] = field(default_factory=list)
+    raw: bytes | int | None = None                              # Last raw response, registers as bytes or bits as a packed bitmap
+    vector: object | None = None                                # VectorDecoder for blocks with many numeric datapoints
+
+    @property
+    def end(self) -> int:
+        return self.address + self.count
+
+    @property
+    def groups(self) -> list[ModbusGroup]:
+        # Groups served by this block, in order of appearance
+        return list(dict.fromkeys(group for group, _, _ in self.datapoints))
+
+def build_read_plan(datapoints: dict[ModbusGroup, dict[str, ModbusDatapoint]], groups, max_gap: int = 0,
+                    holes: dict[ModbusMode, set[int]] | None = None) -> list[ModbusReadBlock]:
+    """Compile the given groups into the fewest possible read requests per function code.
+
+    Unused registers inside the span of a polled group are known to be readable since the driver defined the group,
+    while other unused registers, including those inside groups that are never polled such as CONFIG,
+    are only bridged when there are at most max_gap of them.
+    Spans larger than one request (125 registers or 2000 bits) are split where the fewest unused registers are wasted.
+    Known unreadable addresses (holes) are never included in a request.
+    """
+    members: dict[ModbusMode, list[tuple[ModbusGroup, str, ModbusDatapoint]]] = {}
+    spans: dict[ModbusMode, list[tuple[int, int]]] = {}
+
+    for group in groups:
+        if group.mode == ModbusMode.NONE:
+            continue
+
+        group_members = [(group, key, dp) for key, dp in datapoints.get(group, {}).items()]
+        if not group_members:
+            continue
+
+        start = min(dp.address for _, _, dp in group_members)
+        end = max(dp.address + dp.register_count for _, _, dp in group_members)
+        members.setdefault(group.mode, []).extend(group_members)
+        spans.setdefault(group.mode, [])
+        if group.poll_mode != ModbusPollMode.POLL_OFF:
+            spans[group.mode].append((start, end))
+
+    plan: list[ModbusReadBlock] = []
+    for mode, mode_members in members.items():
+        atoms = _build_atoms(mode, mode_members)
+        mode_holes = sorted((holes or {}).get(mode, ()))
+        plan.extend(_partition_atoms(atoms, spans[mode], max_gap, mode_holes))
+
+    _LOGGER.debug("Built read plan with %s requests: %s", len(plan), [(b.mode.name, b.address, b.count) for b in plan])
+    return plan
+
+def _build_atoms(mode: ModbusMode, members) -> list[ModbusReadBlock]:
+    # Overlapping datapoints have to be read in the same request, so merge them into atoms
+    atoms: list[ModbusReadBlock] = []
+    for member in sorted(members, key=lambda m: m[2].address):
+        dp = member[2]
+        if atoms and dp.address < atoms[-1].end:
+            atom = atoms[-1]
+            atom.count = max(atom.end, dp.address + dp.register_count) - atom.address
+            atom.datapoints.append(member)
+        else:
+            atoms.append(ModbusReadBlock(mode, dp.address, dp.register_count, [member]))
+
+        if atoms[-1].count > max_read_count(mode):
+            raise ValueError(
+                f"Too many registers to read at once ({atoms[-1].count} requested, max {max_read_count(mode)}) "
+                f"for overlapping datapoints at address {atoms[-1].address}."
+            )
+    return atoms
+
+def _partition_atoms(atoms: list[ModbusReadBlock], spans: list[tuple[int, int]], max_gap: int, holes: list[int]) -> list[ModbusReadBlock]:
+    # A gap between two atoms can be read if it is small enough, or lies inside the span of one group,
+    # but never if it contains a known hole
+    bridgeable = [
+        ((b.address - a.end) <= max_gap or any(start <= a.end and b.address <= end for start, end in spans))
+        and not _contains_hole(holes, a.end, b.address)
+        for a, b in zip(atoms, atoms[1:])
+    ]
+
+    max_count = max_read_count(atoms[0].mode) if atoms else MAX_REGISTERS_PER_READ
+
+    # best[j] = (requests, wasted registers, start index of last request) for the first j atoms
+    best: list[tuple[int, int, int]] = [(0, 0, 0)]
+    for j in range(len(atoms)):
+        used = 0
+        candidate = None
+        for i in range(j, -1, -1):
+            if i < j and not bridgeable[i]:
+                break
+            span = atoms[j].end - atoms[i].address
+            if span > max_count:
+                break
+            used += atoms[i].count
+            cost = (best[i][0] + 1, best[i][1] + span - used, i)
+            if candidate is None or cost[:2] < candidate[:2]:
+                candidate = cost
+        best.append(candidate)
+
+    # Walk back through the chosen split points
+    blocks: list[ModbusReadBlock] = []
+    j = len(atoms)
+    while j > 0:
+        i = best[j][2]
+        block = ModbusReadBlock(atoms[i].mode, atoms[i].address, atoms[j - 1].end - atoms[i].address)
+        for atom in atoms[i:j]:
+            block.datapoints.extend(atom.datapoints)
+        blocks.append(block)
+        j = i
+    blocks.reverse()
+    return blocks
+
+def _contains_hole(holes: list[int], start: int, end: int) -> bool:
+    # holes is sorted, check if any of them is in [start, end)
+    i = bisect.bisect_left(holes, start)
+    return i < len(holes) and holes[i] < end
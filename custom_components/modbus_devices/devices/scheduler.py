@@ -0,0 +1,119 @@
+import heapq
+import itertools
+import logging
+
+from .datatypes import ModbusGroup
+
+_LOGGER = logging.getLogger(__name__)
+
+# Groups due within this many seconds are read in the current cycle, to absorb timer jitter
+SCHEDULE_TOLERANCE = 0.5
+
+# Adaptive groups poll faster by this factor when values change, and slower when they don't
+ADAPTIVE_SPEEDUP = 2.0
+ADAPTIVE_SLOWDOWN = 1.5
+
+# Groups that keep failing are retried less often, up to this many seconds apart
+MAX_BACKOFF = 300
+
+class ModbusPollScheduler:
+    """Keeps track of when each polled group is due, using a heap ordered by due time."""
+
+    def __init__(self, default_interval: float):
+        self.default_interval = default_interval
+        self.sample_interval: float | None = None   # Interval of aggregating groups, None uses the default interval
+        self._heap: list[tuple[float, int, ModbusGroup]] = []
+        self._due: dict[str, float] = {}            # Due time per group unique_id, used to skip stale heap entries
+        self._counter = itertools.count()           # Tie breaker, groups are not orderable
+        self._intervals: dict[str, float] = {}      # Current interval of adaptive groups
+        self._last: dict[str, float] = {}           # Last time each group was handed out for reading
+
+    def interval(self, group: ModbusGroup) -> float:
+        if group.unique_id in self._intervals:
+            return self._intervals[group.unique_id]
+        interval = group.poll_interval or self.default_interval
+        if group.aggregate is not None:
+            # Aggregating groups are sampled faster than they are published
+            interval = group.poll_interval or self.sample_interval or self.default_interval
+        elif group.adaptive:
+            interval = min(max(interval, group.min_interval), group.max_interval)
+        return interval
+
+    def adapt(self, group: ModbusGroup, changed: bool, urgent: bool = False):
+        """Shorten the interval of an adaptive group when its values change, lengthen it when they don't."""
+        if not group.adaptive or group.unique_id not in self._last:
+            return
+
+        old_interval = self.interval(group)
+        if urgent:
+            interval = group.min_interval
+        elif changed:
+            interval = max(group.min_interval, old_interval / ADAPTIVE_SPEEDUP)
+        else:
+            interval = min(group.max_interval, old_interval * ADAPTIVE_SLOWDOWN)
+        self._intervals[group.unique_id] = interval
+
+        if interval != old_interval:
+            _LOGGER.debug("Adaptive poll interval for group %s: %.1f s -> %.1f s", group, old_interval, interval)
+            self.schedule(group, self._last[group.unique_id] + interval)
+
+    def backoff(self, group: ModbusGroup, failures: int):
+        """Delay the next poll of a failing group, doubling the delay for every consecutive failure."""
+        if group.unique_id not in self._last:
+            return
+        interval = self.interval(group)
+        delay = max(interval, min(interval * 2 ** (failures - 1), MAX_BACKOFF))
+        self.schedule(group, self._last[group.unique_id] + delay)
+
+    def schedule(self, group: ModbusGroup, due: float):
+        self._due[group.unique_id] = due
+        heapq.heappush(self._heap, (due, next(self._counter), group))
+
+    def reset(self, groups, now: float):
+        # All groups were just read, so schedule each of them one interval from now
+        self._heap = []
+        self._due = {}
+        for group in groups:
+            self._last[group.unique_id] = now
+            self.schedule(group, now + self.interval(group))
+
+    def sync(self, groups, now: float):
+        # Add new groups as due now, and forget groups that are no longer polled
+        wanted = {group.unique_id: group for group in groups}
+        for uid in list(self._due):
+            if uid not in wanted:
+                del self._due[uid]
+        for uid, group in wanted.items():
+            if uid not in self._due:
+                self.schedule(group, now)
+        self._heap = [entry for entry in self._heap if self._due.get(entry[2].unique_id) == entry[0]]
+        heapq.heapify(self._heap)
+
+    def popDue(self, now: float) -> list[ModbusGroup]:
+        # Return all groups that are due, and schedule their next poll
+        due_groups = []
+        next_dues = []
+        while self._heap and self._heap[0][0] <= now + SCHEDULE_TOLERANCE:
+            due, _, group = heapq.heappop(self._heap)
+            if self._due.get(group.unique_id) != due:
+                continue    # Stale entry
+
+            # Keep the original cadence unless we have fallen a whole interval behind
+            interval = self.interval(group)
+            next_due = due + interval
+            if next_due <= now:
+                next_due = now + interval
+
+            due_groups.append(group)
+            next_dues.append(next_due)
+            self._last[group.unique_id] = now
+
+        # Schedule after popping, so a group with an interval shorter than the tolerance is only read once per cycle
+        for group, next_due in zip(due_groups, next_dues):
+            self.schedule(group, next_due)
+        return due_groups
+
+    def nextDue(self) -> float | None:
+        while self._heap and self._due.get(self._heap[0][2].unique_id) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
@@ -0,0 +1,57 @@
+from array import array
+
+from .aggregate import ModbusAggregator
+from .datatypes import ModbusDatapoint
+from .history import ModbusHistory
+
+# Timestamp of values that haven't been read from the device
+NEVER = float("-inf")
+
+class ModbusValueStore:
+    """Current values of all datapoints of a device, indexed by datapoint slot.
+
+    Also holds when each value was last read from the device, the read block it was last decoded from,
+    and the history of datapoints that keep one. Datapoints in aggregating groups collect their samples
+    in an aggregator, and only the aggregate is stored as their value.
+    """
+    __slots__ = ("values", "timestamps", "sources", "changed", "histories", "aggregators")
+
+    def __init__(self):
+        self.values: list = []
+        self.timestamps = array("d")        # time.monotonic() of the last read, NEVER if not read since startup or a write
+        self.sources: list = []             # ModbusReadBlock the value was last decoded from
+        self.changed: set[int] = set()      # Slots whose value changed since popChanged was last called
+        self.histories: dict[int, ModbusHistory] = {}   # History per slot, for datapoints with a history_size
+        self.aggregators: dict[int, ModbusAggregator] = {}  # Aggregator per slot, for datapoints in aggregating groups
+
+    def __len__(self):
+        return len(self.values)
+
+    def bind(self, dp: ModbusDatapoint) -> int:
+        """Give the datapoint a slot in this store, if it doesn't have one already."""
+        if dp._store is not self:
+            self.values.append(None)
+            self.timestamps.append(NEVER)
+            self.sources.append(None)
+            dp.bind(self, len(self.values) - 1)
+            if dp.history_size:
+                self.histories[dp.slot] = ModbusHistory(dp.history_size)
+        return dp.slot
+
+    def record(self, dp: ModbusDatapoint, timestamp: float):
+        """Add the current value of the datapoint to its history, if it keeps one."""
+        history = self.histories.get(dp.slot)
+        if history is not None:
+            history.append(timestamp, dp.value)
+
+    def popChanged(self) -> frozenset[int]:
+        """Return the slots whose value changed since the last call, and start over."""
+        changed = frozenset(self.changed)
+        self.changed.clear()
+        return changed
+
+    def invalidate(self, dp: ModbusDatapoint):
+        """Forget when and from where the value was read, so it is read and decoded again."""
+        if dp._store is self:
+            self.timestamps[dp.slot] = NEVER
+            self.sources[dp.slot] = None
@@ -0,0 +1,83 @@
+import logging
+
+from .codec import byte_permutation
+from .const import ByteOrder, WordOrder, ModbusDataType
+
+try:
+    import numpy as np
+except ImportError:     # Optional, blocks are decoded one datapoint at a time without it
+    np = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Blocks with fewer numeric datapoints than this are faster to decode one by one
+VECTORIZE_MIN_DATAPOINTS = 16
+
+# NumPy dtypes for the sizes that have a native representation, by (type, register_count)
+_DTYPES = {
+    (ModbusDataType.INT, 1): ">i2",
+    (ModbusDataType.INT, 2): ">i4",
+    (ModbusDataType.INT, 4): ">i8",
+    (ModbusDataType.UINT, 1): ">u2",
+    (ModbusDataType.UINT, 2): ">u4",
+    (ModbusDataType.UINT, 4): ">u8",
+    (ModbusDataType.FLOAT, 2): ">f4",
+    (ModbusDataType.FLOAT, 4): ">f8",
+}
+
+# Marks datapoints that have to be decoded by their own codec
+SCALAR = object()
+
+class VectorDecoder:
+    """Decodes all numeric datapoints of a read block at once, one NumPy operation per data type."""
+
+    def __init__(self, block, byte_order: ByteOrder = ByteOrder.MSB, word_order: WordOrder = WordOrder.NORMAL):
+        self.size = len(block.datapoints)
+        self.kinds = []
+
+        # Collect datapoints with the same type and size, and the byte positions they are read from.
+        # Unscaled datapoints are kept apart, so they keep their exact integer value instead of going through float64
+        members: dict[tuple, list[int]] = {}
+        for i, (_, _, dp) in enumerate(block.datapoints):
+            kind = (ModbusDataType(dp.type), dp.register_count)
+            if kind in _DTYPES:
+                identity = dp.scaling == 1 and dp.offset == 0
+                members.setdefault((*kind, identity), []).append(i)
+
+        for (dtype, register_count, identity), indexes in members.items():
+            dps = [block.datapoints[i][2] for i in indexes]
+            positions = np.array([(dp.address - block.address) * 2 for dp in dps])
+            gather = positions[:, None] + np.array(byte_permutation(register_count, byte_order, word_order))[None, :]
+            scaling = np.array([dp.scaling for dp in dps], dtype=float)
+            offset = np.array([dp.offset for dp in dps], dtype=float)
+            self.kinds.append((indexes, gather, np.dtype(_DTYPES[(dtype, register_count)]), scaling, offset, identity, dtype))
+
+    @property
+    def count(self) -> int:
+        return sum(len(kind[0]) for kind in self.kinds)
+
+    def decode(self, raw: bytes) -> list:
+        """Return the value of each datapoint in the block, or SCALAR for those that aren't vectorized."""
+        data = np.frombuffer(raw, dtype=np.uint8)
+        values = [SCALAR] * self.size
+
+        for indexes, gather, dtype, scaling, offset, identity, data_type in self.kinds:
+            raw_values = data[gather].view(dtype).ravel()
+            if identity:
+                decoded = raw_values.tolist()
+            elif data_type == ModbusDataType.FLOAT:
+                decoded = (raw_values * scaling + offset).tolist()
+            else:
+                # Preserve float only when scaling/offset create a fractional part
+                decoded = [v if v % 1 != 0 else int(v) for v in (raw_values * scaling + offset).tolist()]
+
+            for i, value in zip(indexes, decoded):
+                values[i] = value
+        return values
+
+def build_vector_decoder(block, byte_order: ByteOrder, word_order: WordOrder) -> VectorDecoder | None:
+    # Only worth it for blocks with many numeric datapoints
+    if np is None:
+        return None
+    decoder = VectorDecoder(block, byte_order, word_order)
+    return decoder if decoder.count >= VECTORIZE_MIN_DATAPOINTS else None
@@ -1,6 +1,8 @@
 """Base entity class for Modbus Devices integration."""
 import logging
+import time
 
+from homeassistant.core import callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .devices.datatypes import ModbusGroup, ModbusDatapoint
@@ -24,21 +26,101 @@ class ModbusBaseEntity(CoordinatorEntity):
         }
         self._attr_entity_registry_enabled_default = modbusDataPoint.entity_data.enabledDefault
         
-        """Store this entities keys."""
+        self.bind_datapoint(group, key, modbusDataPoint)
+
+        # State as last written, to skip writing it again when nothing changed
+        self._last_available = None
+        self._last_attrs = None
+        self._published_value = None
+        self._published_at = 0.0
+
+    def bind_datapoint(self, group:ModbusGroup, key:str, modbusDataPoint:ModbusDatapoint):
+        """Store this entities keys, and the handle of its value in the device's value store."""
         self._group = group
         self._key = key
-
         self.modbusDataPoint = modbusDataPoint
+
+        # Reading state uses the handle directly, without any group or key lookups
+        self._values = self.coordinator.value_store.values
+        self._handle = self.coordinator.get_handle(group, key)
+
+        # Significant-change filtering, for sensors and numbers that set a deadband
+        entity_data = modbusDataPoint.entity_data
+        self._deadband = getattr(entity_data, "deadband", None)
+        self._deadband_relative = getattr(entity_data, "deadband_relative", None)
+        self._max_publish_interval = getattr(entity_data, "max_publish_interval", None)
         self._loadEntitySettings()
 
+    @property
+    def value(self):
+        """Current value of this entity's datapoint."""
+        return self._values[self._handle]
+
+    async def async_added_to_hass(self):
+        """Tell the coordinator that this datapoint is in use."""
+        await super().async_added_to_hass()
+        self._usedDatapoint = (self._group, self._key)     # Config value entities change their keys later
+        self.coordinator.set_datapoint_used(*self._usedDatapoint, True)
+
+    async def async_will_remove_from_hass(self):
+        """Disabled or removed entities no longer need their datapoint polled."""
+        self.coordinator.set_datapoint_used(*self._usedDatapoint, False)
+        await super().async_will_remove_from_hass()
+
     # Override by subslasses
     def _loadEntitySettings(self):
         pass
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write state when this entity's value, attributes or availability changed."""
+        changed = self.coordinator.data
+        available = self.available
+        attrs = self.extra_state_attributes
+
+        if self._deadband or self._deadband_relative:
+            value_changed = self._is_significant_change(self.value)
+        else:
+            value_changed = changed is None or self._handle in changed
+
+        if not value_changed and available == self._last_available and attrs == self._last_attrs:
+            return
+
+        self._last_available = available
+        self._last_attrs = dict(attrs)     # A copy, drivers update the attrs dict in place
+        self.async_write_ha_state()
+
+    def _is_significant_change(self, value) -> bool:
+        """Check if a value differs enough from the last published one to be published."""
+        published = self._published_value
+        if value == published:
+            return False
+        if not isinstance(value, (int, float)) or not isinstance(published, (int, float)):
+            return True
+
+        band = max(self._deadband or 0, abs(published) * (self._deadband_relative or 0))
+        if abs(value - published) >= band:
+            return True
+
+        # Values within the band are kept in the value store, and published when they have been held back too long
+        return self._max_publish_interval is not None and time.monotonic() - self._published_at >= self._max_publish_interval
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Remember the published value, deadbands are measured from it."""
+        self._published_value = self.value
+        self._published_at = time.monotonic()
+        super().async_write_ha_state()
+
+    @property
+    def available(self):
+        """Unavailable when the coordinator failed, or when the last read of this entity's group failed."""
+        return super().available and self.coordinator.is_group_available(self._group)
+
     @property
     def extra_state_attributes(self):
         """Return entity-specific state attributes."""
-        attrs = self.coordinator.get_attrs(self._group, self._key)
+        attrs = self.modbusDataPoint.entity_data.attrs
         return attrs if attrs is not None else {}
 
     def toggle_entity_visibility(self, hass, visible: bool):
@@ -49,8 +49,7 @@ class ModbusNumberEntity(ModbusBaseEntity, NumberEntity):
     @property
     def native_value(self) -> float | None:
         """Return number value."""
-        val = self.coordinator.get_value(self._group, self._key)
-        return val
+        return self.value
 
     async def async_set_native_value(self, value):
         """ Write value to device """
@@ -1,16 +1,139 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import itertools
 import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
 from typing import Any, Callable
 
 from pymodbus.client import AsyncModbusSerialClient
+from pymodbus.exceptions import ModbusIOException
 
 _LOGGER = logging.getLogger(__name__)
 
+# Polls due within this many seconds are started right away, rather than leaving the bus idle
+POLL_TOLERANCE = 0.5
+
+# Transaction classes, the bus is handed to the lowest waiting one first
+PRIORITY_WRITE = 0          # Writes from entities
+PRIORITY_INTERACTIVE = 1    # Reads a user is waiting for, such as config values and requested updates
+PRIORITY_BACKGROUND = 2     # Regular polling
+
+# Waiting transactions move up one class for every this many seconds they have waited, so polls can't starve
+PRIORITY_AGING = 2.0
+
+# Request deadlines, once a slave has answered LATENCY_MIN_SAMPLES times:
+# time on the wire + LATENCY_MARGIN * p99 of its response latency, at least LATENCY_MIN seconds
+LATENCY_HISTORY = 200
+LATENCY_MIN_SAMPLES = 20
+LATENCY_MARGIN = 1.5
+LATENCY_MIN = 0.05
+
+# Consecutive timeouts of a slave after which its requests get the configured timeout again, until it answers
+LATENCY_MAX_TIMEOUTS = 3
+
+# Class of the transactions started from the current task, see bus_priority
+transaction_priority: contextvars.ContextVar[int] = contextvars.ContextVar("modbus_rtu_priority", default=PRIORITY_BACKGROUND)
+
+# Meter of the queue wait of the current task, see measure_queue_wait
+queue_wait_meter: contextvars.ContextVar[QueueWaitMeter | None] = contextvars.ContextVar("modbus_rtu_queue_wait", default=None)
+
+
+@contextmanager
+def bus_priority(priority: int):
+    """Run the Modbus calls made inside the block with the given transaction class."""
+    token = transaction_priority.set(priority)
+    try:
+        yield
+    finally:
+        transaction_priority.reset(token)
+
+
+class QueueWaitMeter:
+    """Time one device update spends waiting for the bus, as opposed to waiting for the device.
+
+    The given timeout (an asyncio.timeout context) is paused while waiting,
+    so a congested bus doesn't make a healthy device time out.
+    """
+
+    def __init__(self, timeout=None) -> None:
+        self.timeout = timeout
+        self.total = 0.0            # Seconds spent waiting in the queue
+        self.requests = 0           # Number of requests made
+        self._waiting = 0
+        self._remaining: float | None = None
+
+    def start_wait(self) -> None:
+        # Counted only once the timeout is paused, so a failure leaves nothing for end_wait to undo
+        if self._waiting == 0 and self.timeout is not None and self.timeout.when() is not None:
+            loop = asyncio.get_running_loop()
+            remaining = self.timeout.when() - loop.time()
+            self.timeout.reschedule(None)
+            self._remaining = remaining
+        self._waiting += 1
+
+    def end_wait(self, waited: float) -> None:
+        self.total += waited
+        self._waiting -= 1
+        if self._waiting == 0 and self._remaining is not None:
+            loop = asyncio.get_running_loop()
+            self.timeout.reschedule(loop.time() + self._remaining)
+            self._remaining = None
+
+
+@contextmanager
+def measure_queue_wait(meter: QueueWaitMeter):
+    """Add the queue wait of the Modbus calls made inside the block to the meter."""
+    token = queue_wait_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        queue_wait_meter.reset(token)
+
+
+class LatencyTracker:
+    """Response latency of one slave, the time from the end of the request to the end of the response beyond the time on the wire."""
+
+    def __init__(self) -> None:
+        self._samples: deque[float] = deque(maxlen=LATENCY_HISTORY)
+        self._p99: float | None = None
+        self._new_samples = 0
+        self.timeouts = 0           # Consecutive requests that timed out
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, latency: float) -> None:
+        self._samples.append(max(0.0, latency))
+        self._new_samples += 1
+        self.timeouts = 0
+
+    def add_timeout(self, latency: float) -> None:
+        # The latency was at least the deadline, count that as a sample so the deadline grows with a slowing slave
+        self._samples.append(max(0.0, latency))
+        self._p99 = None
+        self.timeouts += 1
+
+    @property
+    def p99(self) -> float | None:
+        # Sorting is only redone every 10 samples
+        if self._samples and (self._p99 is None or self._new_samples >= 10):
+            ordered = sorted(self._samples)
+            self._p99 = ordered[min(len(ordered) - 1, math.ceil(0.99 * len(ordered)) - 1)]
+            self._new_samples = 0
+        return self._p99
+
 
 class RTUBusManager:
-    """Owns a single Modbus RTU serial port and serializes all access."""
+    """Owns a single Modbus RTU serial port and serializes all access.
+
+    Also polls all coordinators on the port from one loop. Due coordinators are refreshed side by side
+    and take turns on the bus per request, so one slow or retrying device can't hold the port for a whole cycle.
+    """
 
     def __init__(self, *, hass, port: str, baudrate: int, bytesize: int, parity: str, stopbits: int, timeout: float) -> None:
         self.hass = hass
@@ -24,10 +147,27 @@ class RTUBusManager:
             "timeout": timeout,
         }
 
-        self._lock = asyncio.Lock()
+        # Transaction queue, replaces a plain lock so writes don't wait behind every queued poll
+        self._busy = False
+        self._waiters: list[tuple[int, float, int, asyncio.Future]] = []     # (priority, enqueued at, sequence, future)
+        self._sequence = itertools.count()
+
+        # Response latency per slave id, for request deadlines
+        self._latency: dict[int, LatencyTracker] = {}
+
+        # Transactions and seconds spent waiting for the bus, per transaction class
+        self._queue_stats = {priority: {"transactions": 0, "wait_total": 0.0, "wait_max": 0.0}
+                             for priority in (PRIORITY_WRITE, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)}
+        self._poll_lateness: dict[str, float] = {}      # Seconds the last poll of each coordinator started after it was due
         self._client: AsyncModbusSerialClient | None = None
         self._users: set[str] = set()
 
+        # Due time (time.monotonic()) of the next poll of each coordinator
+        self._polls: dict[Any, float] = {}
+        self._refreshes: dict[Any, asyncio.Task] = {}     # Refresh in progress of each coordinator
+        self._poll_task: asyncio.Task | None = None
+        self._poll_wakeup = asyncio.Event()
+
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
@@ -52,6 +192,14 @@ class RTUBusManager:
         self._client = client
 
     async def async_stop(self) -> None:
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        self._polls.clear()
+        for task in self._refreshes.values():
+            task.cancel()
+        self._refreshes.clear()
+
         if self._client is None:
             return
 
@@ -76,6 +224,178 @@ class RTUBusManager:
 
         return False
 
+    # ------------------------------------------------------------------
+    # Transactions
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def transaction(self, priority: int | None = None):
+        """Hold the bus for one request, priority defaults to the class set with bus_priority."""
+        await self._acquire(transaction_priority.get() if priority is None else priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        meter = queue_wait_meter.get()
+        if meter is not None:
+            meter.requests += 1
+        stats = self._queue_stats.get(priority)
+        if stats is not None:
+            stats["transactions"] += 1
+
+        if not self._busy and not self._waiters:
+            self._busy = True
+            return
+
+        waiter = (priority, time.monotonic(), next(self._sequence), asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        metered = False
+        try:
+            if meter is not None:
+                meter.start_wait()
+                metered = True
+            await waiter[3]
+        except BaseException:
+            # Cancelled, or the meter failed: never leave a waiter behind that would be handed the bus
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter[3].done() and not waiter[3].cancelled():
+                self._release()     # Handed the bus just as we were cancelled, pass it on
+            raise
+        finally:
+            waited = time.monotonic() - waiter[1]
+            if metered:
+                meter.end_wait(waited)
+            if stats is not None:
+                stats["wait_total"] += waited
+                stats["wait_max"] = max(stats["wait_max"], waited)
+
+    def _release(self) -> None:
+        # Hand the bus to the most urgent waiter, oldest first within a class
+        now = time.monotonic()
+        while self._waiters:
+            waiter = min(self._waiters, key=lambda w: (max(PRIORITY_WRITE, w[0] - int((now - w[1]) / PRIORITY_AGING)), w[2]))
+            self._waiters.remove(waiter)
+            if not waiter[3].done():
+                waiter[3].set_result(None)
+                return
+        self._busy = False
+
+    # ------------------------------------------------------------------
+    # Request deadlines
+    # ------------------------------------------------------------------
+
+    def wire_time(self, request_bytes: int, response_bytes: int) -> float:
+        """Seconds to send a request and receive its response, including the 3.5 character gap after each frame."""
+        cfg = self._serial_cfg
+        bits_per_char = 1 + cfg["bytesize"] + (cfg["parity"] != "N") + cfg["stopbits"]
+        return (request_bytes + response_bytes + 7) * bits_per_char / cfg["baudrate"]
+
+    def request_deadline(self, slave: int, request_bytes: int, response_bytes: int) -> float:
+        """Seconds to wait for a response, from the wire time and the latency of the slave so far."""
+        timeout = self._serial_cfg["timeout"]
+        tracker = self._latency.get(slave)
+        if tracker is None or len(tracker) < LATENCY_MIN_SAMPLES or tracker.timeouts >= LATENCY_MAX_TIMEOUTS:
+            return timeout
+        deadline = self.wire_time(request_bytes, response_bytes) + max(LATENCY_MIN, LATENCY_MARGIN * tracker.p99)
+        return min(timeout, deadline)
+
+    async def _timed_request(self, method: Callable[..., Any], name: str, *args, **kwargs) -> Any:
+        """Run one request within its deadline, and learn the latency of the slave from the response."""
+        slave = kwargs.get("device_id", kwargs.get("slave", 1))
+        request_bytes, response_bytes = frame_sizes(name, kwargs)
+        deadline = self.request_deadline(slave, request_bytes, response_bytes)
+
+        start = time.monotonic()
+        try:
+            response = await asyncio.wait_for(method(*args, **kwargs), deadline)
+        except asyncio.TimeoutError as err:
+            self._latency.setdefault(slave, LatencyTracker()).add_timeout(deadline - self.wire_time(request_bytes, response_bytes))
+            raise ModbusIOException(f"No response from slave {slave} on {self.port} within {deadline:.3f} s") from err
+
+        latency = time.monotonic() - start - self.wire_time(request_bytes, response_bytes)
+        self._latency.setdefault(slave, LatencyTracker()).add(latency)
+        return response
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+
+    def schedule_poll(self, coordinator, delay: float) -> None:
+        """Refresh the coordinator in delay seconds, replacing any poll already scheduled for it."""
+        self._polls[coordinator] = time.monotonic() + delay
+
+        if self._poll_task is None:
+            self._poll_task = self.hass.async_create_background_task(
+                self._async_poll_loop(), name=f"Modbus RTU polling on {self.port}"
+            )
+        self._poll_wakeup.set()
+
+    def cancel_poll(self, coordinator) -> None:
+        self._polls.pop(coordinator, None)
+        self._poll_wakeup.set()
+
+    async def _async_poll_loop(self) -> None:
+        """Start the refresh of every coordinator that is due, and sleep until the next one is."""
+        try:
+            while self._polls:
+                # Cleared first, so a poll scheduled while starting the refreshes isn't missed
+                self._poll_wakeup.clear()
+                now = time.monotonic()
+                for coordinator, due in list(self._polls.items()):
+                    if due - now > POLL_TOLERANCE or coordinator in self._refreshes:
+                        continue
+
+                    # The coordinator schedules its next poll when the refresh is done
+                    del self._polls[coordinator]
+                    self._poll_lateness[coordinator.name] = max(0.0, now - due)
+                    self._refreshes[coordinator] = self.hass.async_create_background_task(
+                        self._async_poll(coordinator), name=f"Modbus RTU poll of {coordinator.name}"
+                    )
+
+                # Sleep until the next poll is due, or until a poll is scheduled or cancelled
+                waiting = [due for coordinator, due in self._polls.items() if coordinator not in self._refreshes]
+                delay = min(waiting) - time.monotonic() if waiting else None
+                try:
+                    await asyncio.wait_for(self._poll_wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._poll_task = None
+
+    async def _async_poll(self, coordinator) -> None:
+        # Requests of concurrent refreshes queue in order, so each device gets one turn on the bus at a time.
+        # Tasks inherit the context they were started from, which may be a user's interactive read
+        try:
+            with bus_priority(PRIORITY_BACKGROUND):
+                await coordinator.async_refresh()
+        except Exception as err:
+            _LOGGER.error("Unexpected error polling %s on %s: %s", coordinator.name, self.port, err, exc_info=err)
+            if coordinator not in self._polls and coordinator.update_interval is not None:
+                self.schedule_poll(coordinator, coordinator.update_interval.total_seconds())
+        finally:
+            self._refreshes.pop(coordinator, None)
+            self._poll_wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        """Queue wait per transaction class, poll lateness per coordinator and learned latency per slave."""
+        return {
+            "port": self.port,
+            "queue": {
+                name: dict(self._queue_stats[priority])
+                for name, priority in (("write", PRIORITY_WRITE), ("interactive", PRIORITY_INTERACTIVE), ("background", PRIORITY_BACKGROUND))
+            },
+            "queued": len(self._waiters),
+            "poll_lateness": dict(self._poll_lateness),
+            "latency_p99": {slave: tracker.p99 for slave, tracker in self._latency.items()},
+        }
+
     # ------------------------------------------------------------------
     # Validation
     # ------------------------------------------------------------------
@@ -96,7 +416,7 @@ class RTUBusManager:
     async def _execute(self, func: Callable[..., Any], *args, **kwargs) -> Any:
         await self.async_start()
 
-        async with self._lock:
+        async with self.transaction():
             return await func(*args, **kwargs)
 
 
@@ -129,6 +449,11 @@ class RTUBusClient:
     def connected(self) -> bool:
         return self._bus._client is not None
 
+    def request_timeout(self, device_id: int, count: int, bits: bool = False) -> float:
+        """Current deadline of a read of count registers, or count bits, from the slave."""
+        request_bytes, response_bytes = frame_sizes("read_coils" if bits else "read_holding_registers", {"count": count})
+        return self._bus.request_deadline(device_id, request_bytes, response_bytes)
+
     # ------------------------------
     # Dynamic method proxying
     # ------------------------------
@@ -136,7 +461,7 @@ class RTUBusClient:
     def __getattr__(self, name: str):
         """
         Proxy async Modbus calls to the shared RTU client,
-        enforcing serialization.
+        enforcing serialization in order of transaction priority.
         """
 
         if name.startswith("_"):
@@ -153,7 +478,24 @@ class RTUBusClient:
             if not callable(method):
                 return method
 
-            async with self._bus._lock:
-                return await method(*args, **kwargs)
+            async with self._bus.transaction():
+                return await self._bus._timed_request(method, name, *args, **kwargs)
 
         return proxy
+
+
+def frame_sizes(name: str, kwargs: dict) -> tuple[int, int]:
+    """Size in bytes of the RTU request and response frames of a client call."""
+    count = kwargs.get("count", 1)
+    if name in ("read_holding_registers", "read_input_registers"):
+        return 8, 5 + 2 * count
+    if name in ("read_coils", "read_discrete_inputs"):
+        return 8, 5 + math.ceil(count / 8)
+
+    # Writes echo the address and count, multiple writes also send their values
+    values = kwargs.get("values")
+    if values is None:
+        return 8, 8
+    if name == "write_coils":
+        return 9 + math.ceil(len(values) / 8), 8
+    return 9 + 2 * len(values), 8
@@ -38,36 +38,37 @@ class ModbusSelectEntity(ModbusBaseEntity, SelectEntity):
             self._attr_device_info = None       # Hide entity
 
     def _loadEntitySettings(self):
-        if self._key == "Config Selection":
+        self._is_config_selection = self._key == "Config Selection"
+        if self._is_config_selection:
             self._options = self.coordinator.get_config_options()
         else:
             self._options = self.modbusDataPoint.entity_data.options
 
+        # Precompute the option list and the reverse map, the first value wins for duplicate options
+        self._option_list = list(self._options.values())
+        self._option_values = {}
+        for key, val in self._options.items():
+            self._option_values.setdefault(val, key)
+
     @property
     def current_option(self):
         try:
-            if self._key == "Config Selection":
+            if self._is_config_selection:
                 optionIndex = self.config_selection
                 option = self._options[optionIndex]
             else:
-                optionIndex = self.coordinator.get_value(self._group, self._key)
-                option = self._options[optionIndex]
+                option = self._options[self.value]
         except Exception as e:
             option = "Unknown"
         return option
 
     @property
     def options(self):
-        return list(self._options.values())
+        return self._option_list
 
     async def async_select_option(self, option):
         """ Find new value """
-        value = None
-
-        for key, val in self._options.items():
-            if val == option:
-                value = key
-                break
+        value = self._option_values.get(option)
 
         if value is None:
             return
@@ -75,7 +76,7 @@ class ModbusSelectEntity(ModbusBaseEntity, SelectEntity):
         """ Write value to device """
         _LOGGER.debug("Select: %s", self._key)
         try:
-            if self._key == "Config Selection":
+            if self._is_config_selection:
                 self.config_selection = value
                 await self.coordinator.config_select(option)
             else:           
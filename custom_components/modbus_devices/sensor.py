@@ -1,6 +1,8 @@
 import logging
+import time
 
 from homeassistant.components.sensor import SensorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
 from .coordinator import ModbusCoordinator
@@ -40,20 +42,40 @@ class ModbusSensorEntity(ModbusBaseEntity, SensorEntity):
         self._attr_suggested_display_precision = self.modbusDataPoint.entity_data.precision
 
         """Cusom Entity properties"""
-        self.enum = self.modbusDataPoint.entity_data.enum
+        enum = self.modbusDataPoint.entity_data.enum
+        self.enum = enum if enum and isinstance(enum, dict) else None
+        self.history_windows = self.modbusDataPoint.entity_data.history_windows or []
 
     @property
     def native_value(self):
         """Return the value of the sensor."""
-        val = self.coordinator.get_value(self._group, self._key)
+        val = self.value
 
-        # Check if self.enum exists and is a dictionary
-        if self.enum and isinstance(self.enum, dict):
+        # Map through the enum if there is one, checked when settings were loaded
+        if self.enum is not None:
             mapped_value = self.enum.get(val)
             if mapped_value is not None:
                 return mapped_value
-            else:
-                return val
-        else:
-            # If no enum, return the raw value
-            return val
\ No newline at end of file
+        return val
+
+    @property
+    def extra_state_attributes(self):
+        """Add statistics over the configured windows from the datapoint's history."""
+        attrs = super().extra_state_attributes
+        if not self.history_windows:
+            return attrs
+
+        history = self.coordinator.get_history(self._group, self._key)
+        if history is None or not len(history):
+            return attrs
+
+        attrs = dict(attrs)
+        now = time.time()
+        for window in self.history_windows:
+            stats = history.stats(window, now)
+            if stats is not None:
+                attrs[f"min_{window}s"] = stats["min"]
+                attrs[f"max_{window}s"] = stats["max"]
+                attrs[f"mean_{window}s"] = stats["mean"]
+        attrs["last_change"] = dt_util.utc_from_timestamp(history.last_change).isoformat()
+        return attrs
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Websocket commands for Modbus Devices."""
+import time
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant):
+    """Register the commands once, they are shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if domain_data.get("websocket_registered"):
+        return
+    domain_data["websocket_registered"] = True
+    websocket_api.async_register_command(hass, websocket_history)
+    websocket_api.async_register_command(hass, websocket_bus_stats)
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/history",
+        vol.Required("device_id"): str,
+        vol.Required("key"): str,
+        vol.Optional("window"): vol.Coerce(float),
+    }
+)
+@callback
+def websocket_history(hass: HomeAssistant, connection, msg: dict):
+    """Return the in-memory samples of a datapoint, with statistics over the window."""
+    coordinator = next(
+        (c for c in hass.data.get(DOMAIN, {}).values() if getattr(c, "device_id", None) == msg["device_id"]), None
+    )
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, f"No device with ID {msg['device_id']}")
+        return
+
+    history = coordinator.find_history(msg["key"])
+    if history is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, f"No history kept for '{msg['key']}'")
+        return
+
+    now = time.time()
+    window = msg.get("window")
+    since = now - window if window is not None else None
+    connection.send_result(msg["id"], {
+        "samples": history.samples(since),
+        "stats": history.stats(window, now) if window is not None else None,
+        "last_change": history.last_change,
+    })
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/bus_stats"})
+@callback
+def websocket_bus_stats(hass: HomeAssistant, connection, msg: dict):
+    """Return queue and latency metrics of the shared RTU buses, and the bus wait of each device's last update."""
+    domain_data = hass.data.get(DOMAIN, {})
+    buses = [bus.stats() for bus in domain_data.get("rtu_buses", {}).values()]
+    devices = {
+        c.devicename: {"port": c.rtu_bus.port, "queue_wait": c.last_queue_wait, "requests": c.last_request_count}
+        for c in domain_data.values() if getattr(c, "rtu_bus", None) is not None
+    }
+    connection.send_result(msg["id"], {"buses": buses, "devices": devices})